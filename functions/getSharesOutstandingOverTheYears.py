@@ -1,10 +1,16 @@
+import os
 import requests
 import pandas as pd
 import csv
 import sys
 from datetime import datetime
 
-def get_shares_outstanding(cik, output_filename='shares_outstanding.csv'):
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import edgar_client
+import holdings_store
+
+def get_shares_outstanding(cik, output_filename='shares_outstanding.csv', store=None):
     """
     Fetches all common shares outstanding data for a given CIK number
     and saves it to a CSV file.
@@ -12,6 +18,7 @@ def get_shares_outstanding(cik, output_filename='shares_outstanding.csv'):
     Parameters:
     cik (str): The CIK number of the company (without leading zeros)
     output_filename (str): The name of the output CSV file
+    store (holdings_store.HoldingsStore): Optional local store every fact of the company is loaded into
     
     Returns:
     pandas.DataFrame: DataFrame containing the shares outstanding data
@@ -19,14 +26,10 @@ def get_shares_outstanding(cik, output_filename='shares_outstanding.csv'):
     # Ensure CIK is properly formatted (remove leading zeros)
     # cik = cik.lstrip('0')
     
-    # Create request header (SEC requires a user-agent with email)
-    headers = {'User-Agent': "your_email@example.com"}  # Replace with your email
-    
     try:
         # Request company facts data from SEC API
-        response = requests.get(
-            f'https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json',
-            headers=headers
+        response = edgar_client.get(
+            f'https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json'
         )
         
         # Check if request was successful
@@ -39,6 +42,9 @@ def get_shares_outstanding(cik, output_filename='shares_outstanding.csv'):
         company_name = company_data.get('entityName', f'CIK{cik}')
         print(f"Retrieving data for: {company_name}")
         
+        if store is not None:
+            print(f"Stored {store.load_company_facts(company_data)} facts")
+        
         # Check if common shares outstanding data exists
         if 'CommonStockSharesOutstanding' not in company_data.get('facts', {}).get('us-gaap', {}):
             # Try alternative field if CommonStockSharesOutstanding doesn't exist
@@ -106,8 +112,8 @@ if __name__ == "__main__":
     if len(sys.argv) > 1:
         cik = sys.argv[1]
         output_file = f"shares_outstanding_CIK{cik}_{datetime.now().strftime('%Y%m%d')}.csv"
-        get_shares_outstanding(cik, output_file)
+        get_shares_outstanding(cik, output_file, store=holdings_store.HoldingsStore())
     else:
         # Example usage (ZURA BIO LD)
         cik = "0001855644"
-        get_shares_outstanding(cik)
\ No newline at end of file
+        get_shares_outstanding(cik, store=holdings_store.HoldingsStore())
\ No newline at end of file
@@ -6,120 +6,128 @@
     Most useful for tracking hedge fund equity holdings, as it provides a comprehensive view of long positions
     Limitations: Doesn't show short positions or non-US securities"""
 
-import requests
+import asyncio
 import pandas as pd
 from datetime import datetime
-import time
 import json
-import re
-from bs4 import BeautifulSoup
+
+import edgar_client
+import fund_index
+import holdings_store
+import infotable
+import parse_pool
+import submissions
 
 class SECAPIException(Exception):
     pass
 
-def fetch_fund_filings_and_holdings(fund_name):
+def fetch_fund_filings_and_holdings(fund_name, concurrent=False, max_in_flight=8, parse_workers=None, store=None):
     """
     Fetch all 13F-HR filings and holdings for a specific fund
     
     Parameters:
     fund_name (str): Name of the fund to search for (e.g., "VANGUARD GROUP")
+    concurrent (bool): Fetch and parse the filings concurrently with asyncio. Requests
+        still go through the global SEC rate limit in edgar_client.
+    max_in_flight (int): Upper bound on filings being fetched at once in concurrent mode
+    parse_workers (int): Processes parsing information tables while fetching continues
+        (default SEC_PARSE_WORKERS; 0 or 1 parses inline)
+    store (holdings_store.HoldingsStore): Optional local store the full holdings are loaded into
     
     Returns:
     pandas.DataFrame: Fund filings and holdings data
     """
-    headers = {
-        'User-Agent': 'your.email@domain.com',  # Replace with your email
-        'Accept-Encoding': 'gzip, deflate'
-    }
-    
     def get_fund_cik(fund_name):
-        """Get CIK number for the fund"""
+        """Get CIK number for the fund from the local cik-lookup-data index"""
         try:
-            response = requests.get(
-                "https://www.sec.gov/Archives/edgar/cik-lookup-data.txt",
-                headers=headers,
-                timeout=10
-            )
-            response.raise_for_status()
-            
-            for line in response.text.splitlines():
-                if fund_name.upper() in line.upper():
-                    cik_match = re.search(r'(\d{10})', line)
-                    if cik_match:
-                        return cik_match.group(1)
-                    cik = line.split(':')[0].strip()
-                    return re.sub(r'\D', '', cik).zfill(10)
-                    
-            raise SECAPIException(f"Could not find CIK for fund {fund_name}")
-            
+            match = fund_index.get_fund_index().resolve(fund_name)
         except Exception as e:
             raise SECAPIException(f"Error fetching fund CIK: {str(e)}")
+        
+        if match is None:
+            raise SECAPIException(f"Could not find CIK for fund {fund_name}")
+        print(f"Matched {fund_name} to {match['name']} (score {match['score']})")
+        return match['cik']
 
     def fetch_13f_filings(cik):
-        """Fetch all 13F-HR filings for the fund"""
+        """Fetch all 13F-HR filings for the fund, including history pages"""
         try:
-            url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            filings = []
-            
-            if 'filings' in data and 'recent' in data['filings']:
-                forms = data['filings']['recent']
-                
-                for idx, form_type in enumerate(forms.get('form', [])):
-                    if form_type == '13F-HR':
-                        filings.append({
-                            'filing_date': forms['filingDate'][idx],
-                            'accession_number': forms['accessionNumber'][idx],
-                            'primary_doc': forms['primaryDocument'][idx]
-                        })
-            
-            return filings
+            return submissions.load_submissions(cik).records(forms=['13F-HR'])
             
         except Exception as e:
             raise SECAPIException(f"Error fetching filings: {str(e)}")
 
-    def process_13f_filing(filing, cik):
-        """Extract all holdings information from 13F-HR filing"""
+    def filing_urls(filing, cik):
+        """Return (info table URL, primary document URL) for a filing"""
+        accession = filing['accession_number'].replace('-', '')
+        base_url = f"https://www.sec.gov/Archives/edgar/data/{cik}/{accession}"
+        return f"{base_url}/infotable.xml", f"{base_url}/{filing['primary_doc']}"
+
+    # Information tables are parsed in worker processes; each returns a columnar
+    # builder that is merged into this one
+    builder = infotable.HoldingsBuilder()
+
+    def submit_info_table(pool, content, filing, filing_url):
+        """Hand an infotable.xml document to the parse pool"""
+        metadata = {
+            'Filing Date': filing['filing_date'], 'Filing URL': filing_url,
+            'filingCik': fund_cik, 'accessionNumber': filing['accession_number'], 'filingDate': filing['filing_date']
+        }
+        return pool.submit(parse_pool.parse_13f, content, metadata)
+
+    def merge_parsed(future):
+        """Merge a finished parse into the builder"""
         try:
-            accession = filing['accession_number'].replace('-', '')
-            info_table_url = f"https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/infotable.xml"
-            filing_url = f"https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/{filing['primary_doc']}"
+            return builder.merge(future.result())
+        except Exception as e:
+            print(f"Error parsing filing: {str(e)}")
+            return 0
+
+    def process_13f_filing(filing, cik, pool):
+        """Fetch a 13F-HR information table and submit it for parsing"""
+        try:
+            info_table_url, filing_url = filing_urls(filing, cik)
             
-            time.sleep(0.1)  # Respect SEC rate limits
-            response = requests.get(info_table_url, headers=headers, timeout=10)
+            response = edgar_client.get(info_table_url)
             
             if response.status_code != 200:
-                return []
+                return None
                 
-            # Parse XML content
-            soup = BeautifulSoup(response.content, 'xml')
-            holdings = []
+            return submit_info_table(pool, response.content, filing, filing_url)
             
-            # Find all information table entries
-            for entry in soup.find_all('infoTable'):
-                name_of_issuer = entry.find('nameOfIssuer')
-                shares = entry.find('sshPrnamt')
-                
-                if name_of_issuer and shares:
-                    holdings.append({
-                        'Filing Date': filing['filing_date'],
-                        'Filing URL': filing_url,
-                        'Company Name': name_of_issuer.text.strip(),
-                        'Shares': int(shares.text.strip())
-                    })
+        except Exception as e:
+            print(f"Error processing filing: {str(e)}")
+            return None
+
+    async def process_13f_filing_async(filing, cik, semaphore, pool):
+        """Async counterpart of process_13f_filing, bounded by semaphore"""
+        try:
+            info_table_url, filing_url = filing_urls(filing, cik)
             
-            return holdings
+            async with semaphore:
+                response = await edgar_client.aget(info_table_url)
+            
+            if response.status_code != 200:
+                return 0
+            
+            print(f"Processing 13F-HR filing from {filing['filing_date']}...")
+            future = submit_info_table(pool, response.content, filing, filing_url)
+            await asyncio.wrap_future(future)
+            return merge_parsed(future)
             
         except Exception as e:
             print(f"Error processing filing: {str(e)}")
-            return []
+            return 0
+
+    async def process_13f_filings_async(filings, cik, pool):
+        """Fetch and parse every filing concurrently"""
+        semaphore = asyncio.Semaphore(max_in_flight)
+        await asyncio.gather(
+            *(process_13f_filing_async(filing, cik, semaphore, pool) for filing in filings)
+        )
 
     # Main execution
-    all_holdings = []
-    
+    fund_cik = None
     try:
         fund_cik = get_fund_cik(fund_name)
         print(f"Found CIK for {fund_name}: {fund_cik}")
@@ -127,19 +135,32 @@ def fetch_fund_filings_and_holdings(fund_name):
         filings = fetch_13f_filings(fund_cik)
         print(f"Found {len(filings)} 13F-HR filings")
         
-        for filing in filings:
-            print(f"Processing 13F-HR filing from {filing['filing_date']}...")
-            holdings = process_13f_filing(filing, fund_cik)
-            all_holdings.extend(holdings)
+        with parse_pool.ParsePool(parse_workers) as pool:
+            if concurrent:
+                asyncio.run(process_13f_filings_async(filings, fund_cik, pool))
+            else:
+                futures = []
+                for filing in filings:
+                    print(f"Processing 13F-HR filing from {filing['filing_date']}...")
+                    future = process_13f_filing(filing, fund_cik, pool)
+                    if future is not None:
+                        futures.append(future)
+                for future in futures:
+                    merge_parsed(future)
             
     except SECAPIException as e:
         print(f"SEC API Error: {str(e)}")
     except Exception as e:
         print(f"Unexpected error: {str(e)}")
     
-    if all_holdings:
-        # Create DataFrame and sort by filing date
-        df = pd.DataFrame(all_holdings)
+    if len(builder):
+        # Build the DataFrame from the columnar buffers and sort by filing date
+        df = builder.to_frame(portfolio_percent=store is not None)
+        if store is not None:
+            store.upsert_filers([{'cik': fund_cik, 'name': fund_name}], kind='fund')
+            print(f"Stored {store.load_13f_holdings(df)} holdings")
+        df = df[['Filing Date', 'Filing URL', 'nameOfIssuer', 'shares']]
+        df = df.rename(columns={'nameOfIssuer': 'Company Name', 'shares': 'Shares'})
         df['Filing Date'] = pd.to_datetime(df['Filing Date'])
         return df.sort_values(['Filing Date', 'Company Name'], ascending=[False, True])
     else:
@@ -150,7 +171,8 @@ def fetch_fund_filings_and_holdings(fund_name):
 if __name__ == "__main__":
     fund_name = "TWO SIGMA INVESTMENTS, LP"
     
-    holdings = fetch_fund_filings_and_holdings(fund_name)
+    store = holdings_store.HoldingsStore()
+    holdings = fetch_fund_filings_and_holdings(fund_name, concurrent=True, store=store)
     
     if not holdings.empty:
         print(f"\nHoldings for {fund_name}:")
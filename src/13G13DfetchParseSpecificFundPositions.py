@@ -233,306 +233,221 @@
 #     else:
 #         print(f"No positions found for {fund_name}")
 
-import requests
 import pandas as pd
-from datetime import datetime
-import time
-import json
-import re
-from bs4 import BeautifulSoup
+
+import cover_page
+import edgar_client
+import filing_manifest
+import filing_text
+import fund_index
+import holdings_store
+import parse_pool
+import submissions
+import ticker_index
+
+# cover_page.scan keys -> output columns
+COVER_PAGE_COLUMNS = {
+    'source_of_funds': 'Source of Funds',
+    'percent': 'Ownership %',
+    'aggregate': 'Shares Owned',
+    'sole_voting': 'Sole Voting Power',
+    'shared_voting': 'Shared Voting Power'
+}
+
+# Lowest fund_index score accepted for a fund name that does not match exactly
+FUND_MATCH_MIN_SCORE = 0.9
 
 class SECAPIException(Exception):
     pass
 
 def get_cik(ticker):
     """Get CIK number from ticker"""
-    headers = {
-        'User-Agent': 'your.email@domain.com',  # Replace with your email
-        'Accept-Encoding': 'gzip, deflate'
-    }
-    
     try:
-        response = requests.get(
-            "https://www.sec.gov/files/company_tickers.json",
-            headers=headers,
-            timeout=10
-        )
-        response.raise_for_status()
-        
-        companies = response.json()
-        for entry in companies.values():
-            if entry['ticker'] == ticker.upper():
-                return str(entry['cik_str']).zfill(10)
-        raise SECAPIException(f"Could not find CIK for ticker {ticker}")
-        
+        cik = ticker_index.get_cik(ticker)
     except Exception as e:
         raise SECAPIException(f"Error fetching CIK: {str(e)}")
-
-def fetch_ownership_filings(cik):
-    """Fetch 13G/13D filings using both current API and archive"""
-    headers = {
-        'User-Agent': 'your.email@domain.com',  # Replace with your email
-        'Accept-Encoding': 'gzip, deflate'
-    }
-    
-    filings = []
     
-    # 1. Get recent filings from the new API
+    if cik is None:
+        raise SECAPIException(f"Could not find CIK for ticker {ticker}")
+    return cik
+
+def get_fund_cik(fund_name, min_score=FUND_MATCH_MIN_SCORE):
+    """
+    Get CIK number for the fund from the local cik-lookup-data index
+
+    The best match must have the same normalized name or score at least
+    min_score; a loose fuzzy match would silently select another filer.
+    """
     try:
-        url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if 'filings' in data and 'recent' in data['filings']:
-            forms = data['filings']['recent']
-            for idx, form_type in enumerate(forms.get('form', [])):
-                if any(f in form_type for f in ['13G', '13D']):
-                    filings.append({
-                        'form_type': form_type,
-                        'filing_date': forms['filingDate'][idx],
-                        'accession_number': forms['accessionNumber'][idx],
-                        'primary_doc': forms['primaryDocument'][idx]
-                    })
+        match = fund_index.get_fund_index().resolve(fund_name)
     except Exception as e:
-        print(f"Error fetching recent filings: {str(e)}")
-
-    # 2. Get historical filings from EDGAR archive
-    current_year = datetime.now().year
-    start_year = 2018  # Configurable start year
-    
-    for year in range(start_year, current_year + 1):
-        for quarter in range(1, 5):
-            try:
-                # Get the company directory listing
-                archive_url = f"https://www.sec.gov/Archives/edgar/data/{int(cik)}"
-                response = requests.get(archive_url, headers=headers, timeout=10)
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    # Find all links that might be accession numbers
-                    for link in soup.find_all('a'):
-                        accession = link.get('href', '').split('/')[-1]
-                        if re.match(r'\d{10}-\d{2}-\d{6}', accession):
-                            # Check the filing type
-                            try:
-                                filing_url = f"{archive_url}/{accession}"
-                                filing_response = requests.get(filing_url, headers=headers, timeout=10)
-                                filing_soup = BeautifulSoup(filing_response.text, 'html.parser')
-                                
-                                # Look for 13G/13D indicators
-                                filing_type = None
-                                filing_date = None
-                                
-                                for row in filing_soup.find_all('tr'):
-                                    cells = row.find_all('td')
-                                    for cell in cells:
-                                        text = cell.get_text().upper()
-                                        if '13G' in text or '13D' in text:
-                                            filing_type = text.strip()
-                                        if re.match(r'\d{4}-\d{2}-\d{2}', cell.get_text().strip()):
-                                            filing_date = cell.get_text().strip()
-                                
-                                if filing_type and filing_date:
-                                    # Find the primary document
-                                    primary_doc = None
-                                    for doc_link in filing_soup.find_all('a'):
-                                        href = doc_link.get('href', '')
-                                        if href.endswith('.htm') and not href.endswith('index.htm'):
-                                            primary_doc = href.split('/')[-1]
-                                            break
-                                    
-                                    if primary_doc:
-                                        filings.append({
-                                            'form_type': filing_type,
-                                            'filing_date': filing_date,
-                                            'accession_number': accession,
-                                            'primary_doc': primary_doc
-                                        })
-                                
-                                time.sleep(0.1)  # Respect SEC rate limits
-                            except Exception as e:
-                                print(f"Error processing archive filing {accession}: {str(e)}")
-                                continue
-                
-                time.sleep(0.1)  # Respect SEC rate limits
-            except Exception as e:
-                print(f"Error accessing archive for {year} Q{quarter}: {str(e)}")
-                continue
+        raise SECAPIException(f"Error fetching fund CIK: {str(e)}")
     
-    return filings
+    if match is None:
+        raise SECAPIException(f"Could not find CIK for fund {fund_name}")
+    exact = fund_index.normalize_name(match['name']) == fund_index.normalize_name(fund_name)
+    if not exact and match['score'] < min_score:
+        raise SECAPIException(
+            f"Best match for fund {fund_name} is {match['name']} (score {match['score']}), "
+            f"below {min_score}"
+        )
+    print(f"Matched {fund_name} to {match['name']} (score {match['score']})")
+    return match['cik']
 
-def extract_percentage(text):
-    """Extract percentage from filing text with improved footnote handling"""
-    patterns = [
-        # Handle percentages with footnote references
-        r'\(13\).*?Percent.*?Row.*?(\d+\.?\d*)\s*(?:\([0-9]\))?',
-        r'Percent of Class.*?:\s*(\d+\.?\d*)\s*(?:\([0-9]\))?',
-        r'(\d+\.?\d*)%?\s*(?:\([0-9]\))?\s*$',
-        # Original patterns
-        r'PERCENT OF CLASS REPRESENTED.*?(\d+\.?\d*)%',
-        r'PERCENTAGE OF CLASS REPRESENTED.*?(\d+\.?\d*)%'
-    ]
-    
-    def clean_number(value):
-        """Clean and convert extracted number to float"""
-        try:
-            return float(value.strip('% '))
-        except ValueError:
-            return None
-            
-    # First try exact patterns
-    for pattern in patterns:
-        match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-        if match:
-            result = clean_number(match.group(1))
-            if result is not None and result <= 100:  # Basic validation
-                return result
-    
-    # If no match, try to find percentage in the text
-    numbers = re.findall(r'(\d+\.?\d*)\s*%?\s*(?:\([0-9]\))?', text)
-    for num in numbers:
-        result = clean_number(num)
-        if result is not None and result <= 100:
-            return result
-    
-    return None
+def fetch_ownership_filings(cik, start_year=None):
+    """Fetch 13G/13D filings across the full submissions history, each accession once"""
+    since = f"{start_year}-01-01" if start_year else None
+    try:
+        return list(submissions.iter_filings(
+            cik,
+            form_filter=lambda form_type: '13G' in form_type or '13D' in form_type,
+            since=since
+        ))
+    except Exception as e:
+        raise SECAPIException(f"Error fetching filings: {str(e)}")
 
-def extract_shares(text):
-    """Extract number of shares with improved footnote handling"""
-    patterns = [
-        # Handle share counts with footnote references
-        r'\(11\).*?Aggregate Amount.*?:\s*(\d+(?:,\d{3})*)\s*(?:\([0-9]\))?',
-        r'Aggregate Amount.*?Row.*?11.*?(\d+(?:,\d{3})*)\s*(?:\([0-9]\))?',
-        r'(\d+(?:,\d{3})*)\s*(?:\([0-9]\))?\s*$',
-        # Original patterns
-        r'SHARES BENEFICIALLY OWNED.*?(\d+(?:,\d{3})*)',
-        r'AGGREGATE.*?SHARES.*?(\d+(?:,\d{3})*)'
-    ]
-    
-    def clean_number(value):
-        """Clean and convert extracted number to integer"""
-        try:
-            return int(value.replace(',', ''))
-        except ValueError:
-            return None
-    
-    # First try exact patterns
-    for pattern in patterns:
-        match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-        if match:
-            result = clean_number(match.group(1))
-            if result is not None:
-                return result
-    
-    return None
+def document_url(filing, cik):
+    """URL of the raw primary document (new-format filings list the XSL-rendered view)"""
+    accession = filing['accession_number'].replace('-', '')
+    primary_doc = filing_manifest.raw_document_name(filing['primary_doc'])
+    return f"https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/{primary_doc}"
 
-def extract_source_of_funds(text):
-    """Extract source of funds information"""
-    match = re.search(r'\(4\).*?Source of Funds.*?:\s*(\w+)', text, re.DOTALL | re.IGNORECASE)
-    if match:
-        return match.group(1).strip()
-    return None
+def ownership_rows(persons, filing, ticker, doc_url):
+    """Turn parsed cover pages into output rows"""
+    results = []
+    for person in persons:
+        investor_name = person['name']
+        
+        # Skip empty or header sections
+        if len(investor_name) < 3 or 'NAME OF REPORTING' in investor_name:
+            continue
+        
+        ownership_info = {
+            'Investor': investor_name,
+            'Ticker': ticker,
+            'Form Type': filing['form_type'],
+            'Filing Date': filing['filing_date'],
+            'Document URL': doc_url
+        }
+        
+        for key, column in COVER_PAGE_COLUMNS.items():
+            if key in person:
+                ownership_info[column] = person[key]
+        
+        if 'percent' in person or 'aggregate' in person:
+            results.append(ownership_info)
+    
+    return results
 
 def process_filing(filing, cik, ticker):
     """Process filing with improved handling of different fund types"""
-    headers = {
-        'User-Agent': 'your.email@domain.com',  # Replace with your email
-        'Accept-Encoding': 'gzip, deflate'
-    }
-    
     try:
-        accession = filing['accession_number'].replace('-', '')
-        doc_url = f"https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/{filing['primary_doc']}"
+        doc_url = document_url(filing, cik)
         print(f"Processing: {doc_url}")
-        time.sleep(0.1)  # Respect SEC rate limits
         
-        response = requests.get(doc_url, headers=headers, timeout=10)
-        if response.status_code != 200:
-            print(f"Failed to fetch document: {doc_url}")
-            return None
-            
-        content = response.text.upper()
-        
-        # Split content into sections based on CUSIP repeated headers
-        sections = re.split(r'CUSIP.*?\d+', content)
-        
-        results = []
-        for section in sections:
-            # Look for reporting person name
-            name_match = re.search(r'NAME OF REPORTING PERSONS?.*?\n(.*?)\n', section, re.DOTALL)
-            if name_match:
-                investor_name = name_match.group(1).strip()
-                
-                # Skip empty or header sections
-                if len(investor_name) < 3 or 'NAME OF REPORTING' in investor_name:
-                    continue
-                
-                ownership_info = {
-                    'Investor': investor_name,
-                    'Ticker': ticker,
-                    'Form Type': filing['form_type'],
-                    'Filing Date': filing['filing_date'],
-                    'Document URL': doc_url
-                }
-                
-                # Extract source of funds
-                source_of_funds = extract_source_of_funds(section)
-                if source_of_funds:
-                    ownership_info['Source of Funds'] = source_of_funds
-                
-                percentage = extract_percentage(section)
-                if percentage is not None:
-                    ownership_info['Ownership %'] = percentage
-                
-                shares = extract_shares(section)
-                if shares is not None:
-                    ownership_info['Shares Owned'] = shares
-                
-                # Check for sole/shared voting power
-                sole_voting_match = re.search(r'\(7\).*?Sole Voting Power.*?(\d+(?:,\d{3})*)', section, re.DOTALL)
-                if sole_voting_match:
-                    ownership_info['Sole Voting Power'] = int(sole_voting_match.group(1).replace(',', ''))
-                
-                shared_voting_match = re.search(r'\(8\).*?Shared Voting Power.*?(\d+(?:,\d{3})*)', section, re.DOTALL)
-                if shared_voting_match:
-                    ownership_info['Shared Voting Power'] = int(shared_voting_match.group(1).replace(',', ''))
-                
-                if percentage is not None or shares is not None:
-                    results.append(ownership_info)
-        
-        return results
+        # Structured XML is read directly; legacy HTML/text is normalized once
+        # (cached per accession) and goes through the cover page scanner
+        return ownership_rows(cover_page.parse_document(doc_url), filing, ticker, doc_url)
             
     except Exception as e:
         print(f"Error processing filing: {str(e)}")
         return None
 
-def fetch_fund_positions(fund_name, tickers, start_year=2018):
-    """Main function with improved results handling"""
+def submit_filing(pool, filing, cik):
+    """
+    Fetch a filing's primary document and hand it to the parse pool
+
+    Returns:
+    tuple: (document URL, future, whether the normalized text should be cached), or None
+    """
+    doc_url = document_url(filing, cik)
+    text = filing_text.cached_text(doc_url)
+    if text is not None:
+        return doc_url, pool.submit(parse_pool.parse_13dg_text, text), False
+    
+    response = edgar_client.get(doc_url)
+    if response.status_code != 200:
+        print(f"Failed to fetch document: {doc_url}")
+        return None
+    return doc_url, pool.submit(parse_pool.parse_13dg, response.content), True
+
+def fetch_fund_positions(fund_name, tickers, start_year=2018, parse_workers=None, fund_centric=True):
+    """
+    Main function with improved results handling
+
+    In fund-centric mode the fund's CIK is resolved and its own 13D/13G
+    filings are listed once (they appear in the filer's submissions as well
+    as the subject company's); each ticker's filings are then intersected
+    with that set, so only the fund's documents are fetched and parsed (each
+    ticker's submissions are still listed, from start_year on). The fund
+    name must resolve exactly or score at least FUND_MATCH_MIN_SCORE. With
+    fund_centric=False, or if the fund cannot be resolved, every 13D/13G
+    filed against each ticker is parsed.
+
+    Documents are fetched in this process and parsed in a process pool
+    (parse_workers, default SEC_PARSE_WORKERS), so parsing overlaps fetching.
+    """
     all_positions = []
+    pending = []
     
-    for ticker in tickers:
+    fund_accessions = None
+    if fund_centric:
         try:
-            print(f"\nFetching positions for {fund_name} in {ticker}...")
-            
-            cik = get_cik(ticker)
-            print(f"Found CIK: {cik}")
-            
-            filings = fetch_ownership_filings(cik)
-            print(f"Found {len(filings)} 13G/13D filings")
-            
-            for filing in filings:
-                results = process_filing(filing, cik, ticker)
-                if results:
-                    all_positions.extend(results)
-                    print(f"Successfully processed {filing['form_type']} filing from {filing['filing_date']}")
-            
+            fund_cik = get_fund_cik(fund_name)
+            fund_accessions = {
+                filing['accession_number'] for filing in fetch_ownership_filings(fund_cik, start_year)
+            }
+            print(f"Found {len(fund_accessions)} 13G/13D filings by {fund_name} ({fund_cik})")
         except SECAPIException as e:
-            print(f"SEC API Error for {ticker}: {str(e)}")
-            continue
-        except Exception as e:
-            print(f"Unexpected error for {ticker}: {str(e)}")
-            continue
+            print(f"WARNING: fund-centric lookup disabled for {fund_name}: {str(e)}")
+            print("WARNING: falling back to fetching and parsing every 13G/13D filed against each ticker")
+    
+    with parse_pool.ParsePool(parse_workers) as pool:
+        for ticker in tickers:
+            try:
+                print(f"\nFetching positions for {fund_name} in {ticker}...")
+                
+                cik = get_cik(ticker)
+                print(f"Found CIK: {cik}")
+                
+                filings = fetch_ownership_filings(cik, start_year)
+                if fund_accessions is not None:
+                    filings = [filing for filing in filings if filing['accession_number'] in fund_accessions]
+                print(f"Found {len(filings)} 13G/13D filings")
+                
+                for filing in filings:
+                    try:
+                        submitted = submit_filing(pool, filing, cik)
+                    except Exception as e:
+                        print(f"Error processing filing: {str(e)}")
+                        continue
+                    if submitted:
+                        pending.append((filing, ticker) + submitted)
+                
+            except SECAPIException as e:
+                print(f"SEC API Error for {ticker}: {str(e)}")
+                continue
+            except Exception as e:
+                print(f"Unexpected error for {ticker}: {str(e)}")
+                continue
+        
+        for filing, ticker, doc_url, future, cache_text in pending:
+            try:
+                parsed = future.result()
+                if cache_text:
+                    persons, text = parsed
+                    if text is not None:
+                        filing_text.store_text(doc_url, text)
+                else:
+                    persons = parsed
+            except Exception as e:
+                print(f"Error parsing {doc_url}: {str(e)}")
+                continue
+            
+            results = ownership_rows(persons, filing, ticker, doc_url)
+            if results:
+                all_positions.extend(results)
+                print(f"Successfully processed {filing['form_type']} filing from {filing['filing_date']}")
     
     if all_positions:
         df = pd.DataFrame(all_positions)
@@ -559,5 +474,9 @@ if __name__ == "__main__":
         output_file = f"{fund_name.replace(' ', '_').lower()}_positions.csv"
         positions.to_csv(output_file, index=False)
         print(f"\nData saved to {output_file}")
+        
+        # Keep the positions in the local store as well
+        stored = holdings_store.HoldingsStore().load_13dg_positions(positions, filer_cik=get_fund_cik(fund_name))
+        print(f"Stored {stored} positions")
     else:
         print("No positions found")
\ No newline at end of file
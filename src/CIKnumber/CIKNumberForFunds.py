@@ -1,6 +1,13 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import requests
 import json
 
+import ticker_index
+
 def find_cik(company_name):
     """
     Find CIK number for a company using SEC's EDGAR API
@@ -11,30 +18,9 @@ def find_cik(company_name):
     Returns:
     dict: Dictionary containing CIK and company name if found, None if not found
     """
-    # Format the URL and headers
-    base_url = "https://www.sec.gov/files/company_tickers.json"
-    headers = {
-        'User-Agent': 'xhaxhilenzi@gmail.com'  # Replace with your information
-    }
-    
     try:
-        # Make the request to SEC
-        response = requests.get(base_url, headers=headers)
-        response.raise_for_status()
-        
-        # Parse the JSON response
-        data = response.json()
-        
-        # Search for the company (case-insensitive)
-        company_name_lower = company_name.lower()
-        for entry in data.values():
-            if company_name_lower in entry['title'].lower():
-                return {
-                    'cik': str(entry['cik_str']).zfill(10),
-                    'name': entry['title']
-                }
-        
-        return None
+        # Search the shared ticker index (case-insensitive)
+        return ticker_index.get_ticker_index().find_title(company_name)
         
     except requests.exceptions.RequestException as e:
         print(f"Error making request: {e}")
@@ -1,20 +1,25 @@
-import requests
 import pandas as pd
 
-def get_latest_shares_outstanding(cik, email):
+import edgar_client
+import holdings_store
+
+def get_latest_shares_outstanding(cik, email, store=None):
     """
     Fetches the latest reported Total Shares Outstanding for a given company CIK.
+
+    When a holdings_store.HoldingsStore is given, every fact of the company is loaded into it.
     """
-    headers = {'User-Agent': email}
     sec_url = f"https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json"
 
     print(f"📡 Fetching shares outstanding data from: {sec_url}")
     
-    response = requests.get(sec_url, headers=headers)
+    response = edgar_client.get(sec_url, user_agent=email)
     if response.status_code != 200:
         raise ValueError(f"Failed to fetch company facts: {response.status_code}")
 
     company_facts = response.json()
+    if store is not None:
+        print(f"💾 Stored {store.load_company_facts(company_facts)} facts")
 
     try:
         # ✅ Extract all reported shares outstanding data
@@ -48,7 +53,9 @@ if __name__ == "__main__":
     email = "xhaxhilenzi@gmail.com"  # Replace with your SEC-compliant email
     cik = "0001838359"  # Example CIK for Rigetti Computing
 
-    shares_outstanding, report_date, filing_type = get_latest_shares_outstanding(cik, email)
+    shares_outstanding, report_date, filing_type = get_latest_shares_outstanding(
+        cik, email, store=holdings_store.HoldingsStore()
+    )
 
     print("\n📌 Final Shares Outstanding Result:")
     print(f"Shares Outstanding: {shares_outstanding}, Report Date: {report_date}, Filing Type: {filing_type}")
@@ -1,12 +1,10 @@
-import requests
 import pandas as pd
 
-# create request header
-headers = {'User-Agent': "email@address.com"}
+import edgar_client
+
 cik = "0001838359" # Example CIK for Rigetti Computing
-companyFacts = requests.get(
-    f'https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json',
-    headers=headers
+companyFacts = edgar_client.get(
+    f'https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json'
     )
 
 # filing metadata
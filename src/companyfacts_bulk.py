@@ -0,0 +1,198 @@
+"""Bulk loader for SEC's companyfacts.zip archive.
+
+https://www.sec.gov/Archives/edgar/daily-index/xbrl/companyfacts.zip holds one
+CIK##########.json member per company (the same document served by
+api/xbrl/companyfacts). Instead of ~10k HTTP calls, the archive is read from
+local disk: members are streamed out of the zip without extracting it, split
+across worker processes, and flattened into a long-format table with one row
+per reported value:
+
+    cik, entityName, taxonomy, concept, label, unit, start, end, val,
+    accn, fy, fp, form, filed, frame
+
+When out_dir is given each worker writes its batch as a Parquet shard
+(part-#####.parquet), so the whole universe never has to sit in one process.
+Repeated strings are stored as categoricals, and every shard is written with
+FACT_SCHEMA so batches whose values happen to infer different types (integer
+vs float val, all-null start) still read back as one dataset."""
+
+import json
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+
+FACT_COLUMNS = [
+    'cik', 'entityName', 'taxonomy', 'concept', 'label', 'unit', 'start', 'end',
+    'val', 'accn', 'fy', 'fp', 'form', 'filed', 'frame'
+]
+_CATEGORICAL = ['cik', 'entityName', 'taxonomy', 'concept', 'label', 'unit']
+
+_STRING = pa.dictionary(pa.int32(), pa.string())
+FACT_SCHEMA = pa.schema([
+    ('cik', _STRING),
+    ('entityName', _STRING),
+    ('taxonomy', _STRING),
+    ('concept', _STRING),
+    ('label', _STRING),
+    ('unit', _STRING),
+    ('start', pa.string()),
+    ('end', pa.string()),
+    ('val', pa.float64()),
+    ('accn', pa.string()),
+    ('fy', pa.int16()),
+    ('fp', pa.string()),
+    ('form', pa.string()),
+    ('filed', pa.string()),
+    ('frame', pa.string()),
+])
+
+
+def flatten_company_facts(data, columns=None):
+    """
+    Append every fact of one companyfacts document to column lists
+
+    Parameters:
+    data (dict): Parsed companyfacts JSON
+    columns (dict): Column name -> list to append to; a new dict is created if omitted
+
+    Returns:
+    dict: The column lists
+    """
+    if columns is None:
+        columns = {name: [] for name in FACT_COLUMNS}
+    cik = str(data.get('cik', '')).zfill(10)
+    entity_name = data.get('entityName')
+
+    for taxonomy, items in data.get('facts', {}).items():
+        for concept, details in items.items():
+            label = details.get('label') or concept
+            for unit, values in details.get('units', {}).items():
+                for entry in values:
+                    columns['cik'].append(cik)
+                    columns['entityName'].append(entity_name)
+                    columns['taxonomy'].append(taxonomy)
+                    columns['concept'].append(concept)
+                    columns['label'].append(label)
+                    columns['unit'].append(unit)
+                    columns['start'].append(entry.get('start'))
+                    columns['end'].append(entry.get('end'))
+                    columns['val'].append(entry.get('val'))
+                    columns['accn'].append(entry.get('accn'))
+                    columns['fy'].append(entry.get('fy'))
+                    columns['fp'].append(entry.get('fp'))
+                    columns['form'].append(entry.get('form'))
+                    columns['filed'].append(entry.get('filed'))
+                    columns['frame'].append(entry.get('frame'))
+    return columns
+
+
+def columns_to_frame(columns):
+    """Build a compact DataFrame from flattened column lists"""
+    frame = pd.DataFrame(columns, columns=FACT_COLUMNS)
+    for name in _CATEGORICAL:
+        frame[name] = frame[name].astype('category')
+    frame['val'] = pd.to_numeric(frame['val'], errors='coerce').astype('float64')
+    frame['fy'] = pd.to_numeric(frame['fy'], errors='coerce').astype('Int16')
+    return frame
+
+
+def _load_members(zip_path, members, out_path=None):
+    """Worker: flatten a batch of zip members, optionally writing a Parquet shard"""
+    columns = {name: [] for name in FACT_COLUMNS}
+    with zipfile.ZipFile(zip_path) as archive:
+        for member in members:
+            try:
+                with archive.open(member) as f:
+                    flatten_company_facts(json.load(f), columns)
+            except (ValueError, KeyError) as e:
+                print(f"Skipping {member}: {str(e)}")
+
+    frame = columns_to_frame(columns)
+    if out_path is None:
+        return frame
+    frame.to_parquet(out_path, index=False, schema=FACT_SCHEMA)
+    return out_path
+
+
+def list_members(zip_path, ciks=None):
+    """Names of the CIK##########.json members, optionally restricted to some CIKs"""
+    wanted = {str(cik).zfill(10) for cik in ciks} if ciks is not None else None
+    with zipfile.ZipFile(zip_path) as archive:
+        names = [info.filename for info in archive.infolist() if info.filename.endswith('.json')]
+    if wanted is not None:
+        names = [name for name in names if os.path.basename(name)[3:13] in wanted]
+    return sorted(names)
+
+
+def load_companyfacts_zip(zip_path, out_dir=None, ciks=None, workers=None, batch_size=250):
+    """
+    Flatten companyfacts.zip into a long-format fact table using worker processes
+
+    Parameters:
+    zip_path (str): Local path of companyfacts.zip
+    out_dir (str): Write Parquet shards here instead of returning one DataFrame
+    ciks (list): Only load these CIKs
+    workers (int): Worker processes (default: os.cpu_count())
+    batch_size (int): Companies per task / shard
+
+    Returns:
+    pandas.DataFrame, or list of shard paths when out_dir is given
+    """
+    members = list_members(zip_path, ciks)
+    batches = [members[i:i + batch_size] for i in range(0, len(members), batch_size)]
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+        out_paths = [os.path.join(out_dir, f"part-{i:05d}.parquet") for i in range(len(batches))]
+    else:
+        out_paths = [None] * len(batches)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(
+            _load_members, [zip_path] * len(batches), batches, out_paths
+        ))
+    print(f"Loaded {len(members)} companies in {len(batches)} batches")
+
+    if out_dir is not None:
+        return results
+    if not results:
+        return columns_to_frame({name: [] for name in FACT_COLUMNS})
+    return pd.concat(results, ignore_index=True)
+
+
+def read_facts(out_dir, columns=None, filters=None):
+    """
+    Read a fact store written by load_companyfacts_zip
+
+    Parameters:
+    out_dir (str): Directory of Parquet shards
+    columns (list): Only read these columns
+    filters (list): pyarrow filters, e.g. [('concept', '==', 'EntityCommonStockSharesOutstanding')]
+
+    Returns:
+    pandas.DataFrame
+    """
+    frame = pd.read_parquet(out_dir, columns=columns, filters=filters, schema=FACT_SCHEMA)
+    # A nullable int16 column comes back as float64 without the shards' pandas metadata
+    if 'fy' in frame:
+        frame['fy'] = frame['fy'].astype('Int16')
+    return frame
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+
+    zip_path = sys.argv[1] if len(sys.argv) > 1 else "companyfacts.zip"
+    out_dir = sys.argv[2] if len(sys.argv) > 2 else "companyfacts_store"
+    shards = load_companyfacts_zip(zip_path, out_dir=out_dir)
+    print(f"Wrote {len(shards)} shards to {out_dir}")
+
+    # Load the shards into the local store one at a time
+    import holdings_store
+
+    store = holdings_store.HoldingsStore()
+    stored = sum(store.load_facts(pd.read_parquet(shard)) for shard in shards)
+    print(f"Stored {stored} facts")
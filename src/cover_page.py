@@ -0,0 +1,396 @@
+"""Single-pass extractor for Schedule 13D/13G cover pages.
+
+Every reporting person gets one cover page with numbered rows:
+
+    13G: 1 name, 5 sole voting, 6 shared voting, 7 sole dispositive, 8 shared dispositive,
+         9 aggregate amount, 11 percent of class, 12 type of reporting person
+    13D: 1 name, 4 source of funds, 7 sole voting, 8 shared voting, 9 sole dispositive,
+         10 shared dispositive, 11 aggregate amount, 13 percent of class, 14 type
+
+Row numbers differ between the two schedules, so rows are recognised by
+their labels. One precompiled alternation finds every label in a single
+left-to-right pass; each value is read from the text between the end of
+its label and the start of the next one, capped at WINDOW characters.
+Only the cover-page region is scanned: it starts at the first
+reporting-person label and ends at the first "Item 1" after it, or as
+soon as no label follows within MAX_GAP characters, so exhibits and the
+narrative body (often most of a 1 MB document) are never touched, and no
+pattern runs with a leading .*?.
+
+Input is filing_text.normalize() output; values come back upper-cased.
+
+Filings made in the structured Schedule 13D/13G XML format (EDGAR since
+December 2024) carry the same rows as elements; scan_xml reads them
+directly and parse() picks the XML path whenever the document is XML."""
+
+import re
+import xml.etree.ElementTree as ET
+
+import edgar_client
+import filing_text
+
+# Longest stretch after a label that can hold its value
+WINDOW = 400
+# Scanning stops when no label follows the previous one within this many characters
+MAX_GAP = 4000
+
+# Optional "(SEE INSTRUCTIONS)" / "IN ROW (9)" style trailers that belong to the label
+_ROW_REF = r'(?:\s*(?:BY\s+AMOUNT\s+)?IN\s+ROW\s*\(?\d{1,2}\)?)?'
+
+_LABELS = {
+    'name': r'NAMES?\s+OF\s+REPORTING\s+PERSONS?',
+    'irs': r'(?:S\.S\.\s+OR\s+)?I\.?R\.?S\.?\s+IDENTIFICATION(?:\s+NOS?\.?(?:\s+OF\s+ABOVE\s+PERSONS?)?)?',
+    'group': r'CHECK\s+THE\s+APPROPRIATE\s+BOX',
+    'sec_use': r'SEC\s+USE\s+ONLY',
+    'source_of_funds': r'SOURCE\s+OF\s+FUNDS',
+    'citizenship': r'CITIZENSHIP\s+OR\s+PLACE\s+OF\s+ORGANI[SZ]ATION',
+    'number_of_shares': r'NUMBER\s+OF\s+SHARES\s+BENEFICIALLY\s+OWNED\s+BY\s+EACH\s+REPORTING\s+PERSON\s+WITH',
+    'sole_voting': r'SOLE\s+VOTING\s+POWER',
+    'shared_voting': r'SHARED\s+VOTING\s+POWER',
+    'sole_dispositive': r'SOLE\s+DISPOSITIVE\s+POWER',
+    'shared_dispositive': r'SHARED\s+DISPOSITIVE\s+POWER',
+    'aggregate': r'AGGREGATE\s+AMOUNT\s+BENEFICIALLY\s+OWNED(?:\s+BY\s+EACH\s+REPORTING\s+PERSON)?',
+    'excludes': r'CHECK\s+(?:BOX\s+)?IF\s+THE\s+AGGREGATE\s+AMOUNT',
+    'percent': r'PERCENT(?:AGE)?\s+OF\s+CLASS\s+REPRESENTED' + _ROW_REF,
+    'type': r'TYPE\s+OF\s+REPORTING\s+PERSON',
+}
+
+# Matched against upper-cased text, so no IGNORECASE
+_MARKER = re.compile('|'.join(f"(?P<{key}>{pattern})" for key, pattern in _LABELS.items()))
+# Row number of the next label ("6", "6.", "(6)") left at the end of a window
+_NEXT_ROW = re.compile(r'\(?\b(\d{1,2})[.)]?\s*$')
+# Row numbers each label can carry (13G, 13D)
+_ROWS = {
+    'name': {1}, 'irs': {1}, 'group': {2}, 'sec_use': {3}, 'source_of_funds': {4},
+    'citizenship': {4, 6}, 'number_of_shares': set(), 'sole_voting': {5, 7}, 'shared_voting': {6, 8},
+    'sole_dispositive': {7, 9}, 'shared_dispositive': {8, 10}, 'aggregate': {9, 11},
+    'excludes': {10, 12}, 'percent': {11, 13}, 'type': {12, 14},
+}
+# Starts with a literal so re can skip ahead with a fast substring search
+_ITEM_1 = re.compile(r'ITEM\s*1\s*[.(:]')
+_INSTRUCTIONS = re.compile(r'^\s*[:.\-]?\s*(?:\((?:SEE\s+)?INSTRUCTIONS?\)|\(ENTITIES\s+ONLY\))?\s*[:.\-]?')
+_SHARES = re.compile(r'(?<![\d.])(\d{1,3}(?:,\d{3})+|\d+)(?![\d.%])')
+_NONE = re.compile(r'^\s*[:\-]*\s*(?:-0-|NONE|NIL)\b')
+_PERCENT = re.compile(r'(?<![\d.])(\d{1,3}(?:\.\d+)?|\.\d+)\s*%?')
+_FOOTNOTE = re.compile(r'\(\s*\d{1,2}\s*\)|\*')
+_CODE = re.compile(r'\b([A-Z]{2})\b')
+# Codes allowed in row 4 (source of funds) and the type-of-reporting-person row
+SOURCE_CODES = {'SC', 'BK', 'AF', 'WC', 'PF', 'OO'}
+TYPE_CODES = {'BD', 'BK', 'IC', 'IV', 'IA', 'EP', 'HC', 'SA', 'CP', 'CO', 'PN', 'IN', 'OO', 'FI'}
+_SPACE = re.compile(r'\s+')
+_TAX_ID = re.compile(r'[\s,\-]*(?:\(?\s*(?:EIN|IRS)?\s*NO\.?\s*)?\d{2}-\d{7}\)?\s*$')
+
+SHARE_FIELDS = ('sole_voting', 'shared_voting', 'sole_dispositive', 'shared_dispositive', 'aggregate')
+
+
+def _window(text, start, end, next_key=None, numbered=False):
+    """Value text of a row; a trailing number is dropped only if it is the next label's row number"""
+    if end - start > WINDOW:
+        return text[start:start + WINDOW]
+    window = text[start:end]
+    if numbered and next_key is not None:
+        match = _NEXT_ROW.search(window)
+        if match and int(match.group(1)) in _ROWS[next_key]:
+            return window[:match.start()]
+    return window
+
+
+def cover_region(text):
+    """
+    Upper-cased cover-page region of a document
+
+    Returns:
+    tuple: (text, start, end) where start is just before the first
+        reporting-person label and end is the first Item 1 after it
+    """
+    text = text.upper()
+    first_label = text.find('REPORTING PERSON')
+    if first_label == -1:
+        return text, 0, 0
+    start = max(0, text.rfind('NAME', 0, first_label) - 10)
+    item_1 = _ITEM_1.search(text, first_label)
+    return text, start, item_1.start() if item_1 else len(text)
+
+
+def _markers(text, start, end):
+    """Label matches in text[start:end], stopping at the first gap longer than MAX_GAP"""
+    markers = []
+    position = start
+    while position < end:
+        match = _MARKER.search(text, position, min(end, position + MAX_GAP))
+        if match is None:
+            break
+        markers.append((match.lastgroup, match.end(), match.start()))
+        position = match.end()
+    return markers
+
+
+def _is_numbered(text, markers):
+    """Whether cover rows carry row numbers (the first label is preceded by 1, 1. or (1))"""
+    if not markers:
+        return False
+    label_start = markers[0][2]
+    match = _NEXT_ROW.search(text[max(0, label_start - 8):label_start])
+    return match is not None and match.group(1) == '1'
+
+
+def parse_shares(window):
+    """First share count in a row value ("-0-"/"NONE" count as 0)"""
+    if _NONE.match(window):
+        return 0
+    match = _SHARES.search(_FOOTNOTE.sub(' ', window))
+    return int(match.group(1).replace(',', '')) if match else None
+
+
+def parse_percent(window):
+    """First value in 0-100 in a row value"""
+    for match in _PERCENT.finditer(_FOOTNOTE.sub(' ', window)):
+        value = float(match.group(1))
+        if value <= 100:
+            return value
+    return None
+
+
+def parse_name(window):
+    """Reporting person name: the row text minus instructions and the IRS number line"""
+    name = _SPACE.sub(' ', _INSTRUCTIONS.sub('', window, count=1)).strip(' :-')
+    name = _TAX_ID.sub('', name).strip(' :-')
+    return name or None
+
+
+def scan(text):
+    """
+    Parse every cover page in a document
+
+    Parameters:
+    text (str): Filing text with markup removed
+
+    Returns:
+    list: One dict per reporting person with 'name' and, when present,
+        'source_of_funds', 'sole_voting', 'shared_voting', 'sole_dispositive',
+        'shared_dispositive', 'aggregate' (int), 'percent' (float), 'type'
+    """
+    text, start, end = cover_region(text)
+    markers = _markers(text, start, end)
+    numbered = _is_numbered(text, markers)
+
+    persons = []
+    current = None
+    for i, (key, value_start, _) in enumerate(markers):
+        if i + 1 < len(markers):
+            value_end, next_key = markers[i + 1][2], markers[i + 1][0]
+        else:
+            value_end, next_key = end, None
+        window = _window(text, value_start, value_end, next_key, numbered)
+
+        if key == 'name':
+            # The name may also follow the IRS identification label instead
+            current = {'name': parse_name(window)}
+            persons.append(current)
+            continue
+        if current is None:
+            continue
+
+        if key == 'irs':
+            if current['name'] is None:
+                current['name'] = parse_name(window)
+        elif key in SHARE_FIELDS:
+            if key not in current:
+                value = parse_shares(window)
+                if value is not None:
+                    current[key] = value
+        elif key == 'percent':
+            if 'percent' not in current:
+                value = parse_percent(window)
+                if value is not None:
+                    current['percent'] = value
+        elif key in ('source_of_funds', 'type') and key not in current:
+            allowed = SOURCE_CODES if key == 'source_of_funds' else TYPE_CODES
+            codes = [code for code in _CODE.findall(window) if code in allowed]
+            if codes:
+                current[key] = codes[0] if key == 'source_of_funds' else ', '.join(dict.fromkeys(codes))
+
+    persons = [person for person in persons if person['name']]
+    return persons
+
+
+# Structured-format element names (13G and 13D schemas) -> scan() keys
+_XML_FIELDS = {
+    'reportingPersonName': 'name',
+    'fundType': 'source_of_funds',
+    'soleVotingPower': 'sole_voting',
+    'sharedVotingPower': 'shared_voting',
+    'soleDispositivePower': 'sole_dispositive',
+    'sharedDispositivePower': 'shared_dispositive',
+    'aggregateAmountOwned': 'aggregate',
+    'reportingPersonBeneficiallyOwnedAggregateNumberOfShares': 'aggregate',
+    'percentOfClass': 'percent',
+    'classPercent': 'percent',
+    'typeOfReportingPerson': 'type',
+}
+
+
+def _local(tag):
+    return tag.rpartition('}')[2]
+
+
+def _number(text, kind):
+    text = text.strip().replace(',', '').rstrip('%')
+    try:
+        return float(text) if kind is float else int(float(text))
+    except ValueError:
+        return None
+
+
+def is_structured(content):
+    """True if a primary document is a structured 13D/13G XML submission"""
+    head = content[:2048]
+    if isinstance(head, bytes):
+        head = head.decode('utf-8', errors='ignore')
+    head = head.lstrip()
+    return head.startswith('<?xml') or head.startswith('<edgarSubmission')
+
+
+def scan_xml(content):
+    """
+    Read reporting persons from a structured Schedule 13D/13G document
+
+    Elements are matched by local name, so the parser does not depend on
+    the namespace URI or prefix of the schema version.
+
+    Parameters:
+    content (bytes|str): primary_doc.xml
+
+    Returns:
+    list: Same dicts as scan(), with exact values from the XML
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    root = ET.fromstring(content)
+
+    persons = []
+    for element in root.iter():
+        children = list(element)
+        if not any(_local(child.tag) == 'reportingPersonName' for child in children):
+            continue
+
+        person = {}
+        for child in element.iter():
+            key = _XML_FIELDS.get(_local(child.tag))
+            text = (child.text or '').strip()
+            if key is None or not text:
+                continue
+            if key == 'name':
+                person.setdefault('name', text.upper())
+            elif key in ('type', 'source_of_funds'):
+                person[key] = f"{person[key]}, {text}" if key in person else text
+            elif key not in person:
+                value = _number(text, float if key == 'percent' else int)
+                if value is not None:
+                    person[key] = value
+        if person.get('name'):
+            persons.append(person)
+    return persons
+
+
+def parse(content):
+    """
+    Parse the primary document of a 13D/13G filing
+
+    Structured XML submissions are read element by element; legacy HTML/text
+    documents fall back to scan().
+
+    Parameters:
+    content (bytes|str): Raw primary document
+
+    Returns:
+    list: One dict per reporting person (see scan)
+    """
+    persons = parse_structured(content)
+    if persons is not None:
+        return persons
+    return scan(filing_text.normalize(content))
+
+
+def parse_structured(content):
+    """scan_xml() for structured documents, None for legacy ones"""
+    if not is_structured(content):
+        return None
+    try:
+        return scan_xml(content) or None
+    except ET.ParseError:
+        return None
+
+
+def parse_document(url, user_agent=None):
+    """
+    Fetch and parse a 13D/13G primary document
+
+    Legacy documents are normalized once through filing_text and the text is
+    cached per accession, so re-parsing skips the download and the markup pass.
+
+    Parameters:
+    url (str): Archive URL of the raw primary document
+    user_agent (str): Optional User-Agent override for the SEC request
+
+    Returns:
+    list: One dict per reporting person (see scan)
+    """
+    text = filing_text.cached_text(url)
+    if text is not None:
+        return scan(text)
+
+    response = edgar_client.get(url, user_agent=user_agent)
+    response.raise_for_status()
+    persons = parse_structured(response.content)
+    if persons is not None:
+        return persons
+    return scan(filing_text.store_text(url, filing_text.normalize(response.content)))
+
+
+# Benchmark against the regex extractors 13G13DfetchParseSpecificFundPositions.py used
+if __name__ == "__main__":
+    import glob
+    import os
+    import sys
+    import time
+
+    import cover_page_legacy
+
+    corpus = sys.argv[1] if len(sys.argv) > 1 else "13dg_corpus"
+    paths = sorted(glob.glob(os.path.join(corpus, '*')))
+    if not paths:
+        print(f"No documents in {corpus}")
+        sys.exit(1)
+
+    raw_documents = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            raw_documents.append((os.path.basename(path), f.read()))
+
+    start = time.perf_counter()
+    legacy_results = []
+    for _, raw in raw_documents:
+        content = raw.decode('utf-8', errors='replace').upper()
+        sections = re.split(r'CUSIP.*?\d+', content)
+        legacy_results.append([
+            (cover_page_legacy.extract_percentage(s), cover_page_legacy.extract_shares(s)) for s in sections
+        ])
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    texts = [filing_text.normalize(raw) for _, raw in raw_documents]
+    normalize_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scan_results = [scan(text) for text in texts]
+    scan_time = time.perf_counter() - start
+
+    print(f"{len(raw_documents)} documents")
+    print(f"legacy extract_percentage/extract_shares: {legacy_time * 1000 / len(raw_documents):.2f} ms/doc")
+    print(f"filing_text.normalize:                    {normalize_time * 1000 / len(raw_documents):.2f} ms/doc")
+    print(f"cover_page.scan:                          {scan_time * 1000 / len(raw_documents):.2f} ms/doc "
+          f"({legacy_time / scan_time if scan_time else float('inf'):.1f}x)")
+    for (name, _), persons in zip(raw_documents[:5], scan_results[:5]):
+        for person in persons:
+            print(f"  {name}: {person.get('name')} {person.get('aggregate')} shares, {person.get('percent')}%")
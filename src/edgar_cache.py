@@ -0,0 +1,239 @@
+"""On-disk caches for EDGAR responses.
+
+    ArchiveCache: documents under https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/...
+    never change once filed, so they are stored forever (until evicted) and served without
+    touching the network. Entries are keyed by accession + filename, so the same filing
+    reached through the filer's or the subject company's CIK directory is stored once.
+
+    RevalidatingCache: data.sec.gov submissions and companyfacts JSON are mutable but change
+    rarely. They are stored with their ETag/Last-Modified and served locally while fresh;
+    once stale they are revalidated with If-None-Match/If-Modified-Since, so an unchanged
+    document costs a 304 instead of a multi-megabyte download.
+
+Configuration (environment or .env file):
+    SEC_CACHE_DIR               Root directory for all caches (default ~/.cache/13f-tracker)
+    SEC_ARCHIVE_CACHE_MAX_MB    Size bound for the archive cache, least recently used
+                                entries are evicted first (default 2048)
+    SEC_JSON_CACHE_TTL          Seconds a submissions/companyfacts response is served without
+                                revalidation (default 900)"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_DIR = os.path.expanduser(os.getenv('SEC_CACHE_DIR', os.path.join('~', '.cache', '13f-tracker')))
+ARCHIVE_CACHE_MAX_BYTES = int(os.getenv('SEC_ARCHIVE_CACHE_MAX_MB', '2048')) * 1024 * 1024
+JSON_CACHE_TTL = float(os.getenv('SEC_JSON_CACHE_TTL', '900'))
+
+_ARCHIVE_URL = re.compile(
+    r'^https?://www\.sec\.gov/Archives/edgar/data/\d+/(\d{18})/([^?#]+)$'
+)
+_REVALIDATED_URL = re.compile(
+    r'^https?://data\.sec\.gov/('
+    r'submissions/CIK\d{10}(?:-submissions-\d{3})?\.json'
+    r'|api/xbrl/companyfacts/CIK\d{10}\.json'
+    r')$'
+)
+
+
+def parse_archive_url(url):
+    """
+    Split an EDGAR archive document URL into its cache key parts
+
+    Returns:
+    tuple: (accession, filename), or None if the URL is not an immutable filing document
+    """
+    match = _ARCHIVE_URL.match(url)
+    if not match:
+        return None
+    return match.group(1), match.group(2)
+
+
+def write_atomic(path, data):
+    """Write bytes to path so concurrent readers never see a partial file"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ArchiveCache:
+    """Gzip-compressed, size-bounded LRU store for immutable filing documents"""
+
+    def __init__(self, directory=None, max_bytes=ARCHIVE_CACHE_MAX_BYTES):
+        self.directory = directory or os.path.join(CACHE_DIR, 'archives')
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _path(self, accession, filename):
+        digest = hashlib.sha256(f"{accession}/{filename}".encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest[2:] + '.gz')
+
+    def get(self, accession, filename):
+        """
+        Return the cached document
+
+        Returns:
+        tuple: (content bytes, content type), or None on a cache miss
+        """
+        path = self._path(accession, filename)
+        try:
+            with gzip.open(path, 'rb') as f:
+                data = f.read()
+        except (FileNotFoundError, EOFError, OSError):
+            return None
+
+        # Reads refresh the mtime, which is what eviction orders by
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        content_type, _, content = data.partition(b'\n')
+        return content, content_type.decode('ascii', 'replace')
+
+    def put(self, accession, filename, content, content_type=''):
+        """Store a document, evicting least recently used entries if over the size bound"""
+        path = self._path(accession, filename)
+        payload = gzip.compress(content_type.encode('ascii', 'replace') + b'\n' + content, compresslevel=6)
+        try:
+            previous_size = os.path.getsize(path)
+        except OSError:
+            previous_size = 0
+        write_atomic(path, payload)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                # Rewriting a key replaces its old entry
+                self._size += len(payload) - previous_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.gz'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Drop the oldest entries until the cache is back under 90% of its bound"""
+        target = int(self.max_bytes * 0.9)
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+        self._size = total
+
+
+def is_revalidated_url(url):
+    """True for the mutable data.sec.gov JSON documents handled by RevalidatingCache"""
+    return _REVALIDATED_URL.match(url) is not None
+
+
+class RevalidatingCache:
+    """Stores mutable JSON documents alongside their HTTP validators"""
+
+    def __init__(self, directory=None, ttl=JSON_CACHE_TTL):
+        self.directory = directory or os.path.join(CACHE_DIR, 'json')
+        self.ttl = ttl
+
+    def _paths(self, url):
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, digest[:2], digest[2:])
+        return base + '.meta.json', base + '.gz'
+
+    def get_meta(self, url):
+        """
+        Return the stored validators for url
+
+        Returns:
+        dict: {'etag', 'last_modified', 'content_type', 'fetched_at'}, or None on a miss
+        """
+        meta_path, body_path = self._paths(url)
+        if not os.path.exists(body_path):
+            return None
+        try:
+            with open(meta_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, meta):
+        return time.time() - meta.get('fetched_at', 0) < self.ttl
+
+    def conditional_headers(self, meta):
+        """Request headers that let the server answer 304 Not Modified"""
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def read(self, url):
+        _, body_path = self._paths(url)
+        try:
+            with gzip.open(body_path, 'rb') as f:
+                return f.read()
+        except (OSError, EOFError):
+            return None
+
+    def _write_meta(self, url, meta):
+        meta_path, _ = self._paths(url)
+        write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+
+    def put(self, url, content, response_headers):
+        """Store a 200 response body and its validators"""
+        _, body_path = self._paths(url)
+        write_atomic(body_path, gzip.compress(content, compresslevel=6))
+        self._write_meta(url, {
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+            'content_type': response_headers.get('Content-Type', ''),
+            'fetched_at': time.time()
+        })
+
+    def refresh(self, url, meta, response_headers):
+        """Record a 304 revalidation: restart the TTL and pick up any new validators"""
+        meta = dict(meta)
+        meta['etag'] = response_headers.get('ETag') or meta.get('etag')
+        meta['last_modified'] = response_headers.get('Last-Modified') or meta.get('last_modified')
+        meta['fetched_at'] = time.time()
+        self._write_meta(url, meta)
+
+
+archive_cache = ArchiveCache()
+json_cache = RevalidatingCache()
@@ -0,0 +1,188 @@
+"""Shared HTTP client for every SEC EDGAR request made by this project.
+
+    One keep-alive requests.Session (connection pooled)
+    One process-wide token bucket enforcing SEC's 10 requests/second fair-access limit;
+        retries on 429/5xx and connection errors take a token too
+    One configurable User-Agent (SEC rejects requests without a contact email)
+    Filing documents under Archives/edgar/data are served from edgar_cache.archive_cache
+    Submissions/companyfacts JSON is revalidated through edgar_cache.json_cache
+
+Configuration (environment or .env file):
+    SEC_USER_AGENT            Contact string sent as User-Agent, e.g. "Name name@domain.com"
+    SEC_REQUESTS_PER_SECOND   Request budget per second (default 10, SEC's published maximum)
+    SEC_POOL_SIZE             Keep-alive connections kept per host (default 10)"""
+
+import asyncio
+import os
+import threading
+import time
+
+import requests
+from dotenv import load_dotenv
+from pyrate_limiter import Duration, Limiter, Rate
+from requests.adapters import HTTPAdapter
+
+import edgar_cache
+
+load_dotenv()
+
+SEC_REQUESTS_PER_SECOND = int(os.getenv('SEC_REQUESTS_PER_SECOND', '10'))
+SEC_POOL_SIZE = int(os.getenv('SEC_POOL_SIZE', '10'))
+DEFAULT_TIMEOUT = 10
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+MAX_RETRY_DELAY = 60
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+_user_agent = os.getenv('SEC_USER_AGENT', 'your.email@domain.com')  # Replace with your email
+_session = None
+_session_lock = threading.Lock()
+
+# A single bucket shared by every thread in the process. try_acquire sleeps
+# (up to max_delay) until a token is free, so callers never need time.sleep.
+_limiter = Limiter(
+    Rate(SEC_REQUESTS_PER_SECOND, Duration.SECOND),
+    raise_when_fail=False,
+    max_delay=Duration.MINUTE
+)
+
+
+def set_user_agent(user_agent):
+    """Set the User-Agent sent with every request that does not override it"""
+    global _user_agent
+    _user_agent = user_agent
+
+
+def get_user_agent():
+    return _user_agent
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                # No adapter-level retries: they would bypass the rate limiter,
+                # so _send retries through it instead
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=SEC_POOL_SIZE,
+                    max_retries=0
+                )
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update({'Accept-Encoding': 'gzip, deflate'})
+                _session = session
+    return _session
+
+
+def wait_for_slot():
+    """Block until the global rate limiter grants a request slot"""
+    while not _limiter.try_acquire('sec.gov'):
+        time.sleep(0.01)
+
+
+def _retry_delay(attempt, response=None):
+    """Seconds to wait before retry attempt+1: Retry-After if given, else exponential backoff"""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.strip().isdigit():
+        return min(float(retry_after), MAX_RETRY_DELAY)
+    return min(BACKOFF_FACTOR * (2 ** attempt), MAX_RETRY_DELAY)
+
+
+def _send(url, headers, timeout, **kwargs):
+    """GET with retries on 429/5xx and connection errors; every attempt waits for a limiter slot"""
+    session = get_session()
+    for attempt in range(MAX_RETRIES + 1):
+        wait_for_slot()
+        try:
+            response = session.get(url, headers=headers, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(_retry_delay(attempt))
+            continue
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+        time.sleep(_retry_delay(attempt, response))
+        response.close()
+
+
+def _cached_response(url, content, content_type):
+    """Build a 200 Response for content served from a local cache"""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.reason = 'OK'
+    response._content = content
+    if content_type:
+        response.headers['Content-Type'] = content_type
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+def get(url, headers=None, timeout=DEFAULT_TIMEOUT, user_agent=None, use_cache=True, **kwargs):
+    """
+    Rate-limited GET through the shared session
+
+    Parameters:
+    url (str): URL to fetch
+    headers (dict): Extra request headers
+    timeout (float): Request timeout in seconds
+    user_agent (str): Override the configured User-Agent for this request
+    use_cache (bool): Serve/store documents via the disk caches in edgar_cache
+
+    Returns:
+    requests.Response: The response (status is not checked)
+    """
+    archive_key = edgar_cache.parse_archive_url(url) if use_cache else None
+    if archive_key:
+        cached = edgar_cache.archive_cache.get(*archive_key)
+        if cached is not None:
+            return _cached_response(url, *cached)
+
+    request_headers = {'User-Agent': user_agent or _user_agent}
+    if headers:
+        request_headers.update(headers)
+
+    revalidate = use_cache and edgar_cache.is_revalidated_url(url)
+    meta = edgar_cache.json_cache.get_meta(url) if revalidate else None
+    if meta is not None:
+        if edgar_cache.json_cache.is_fresh(meta):
+            content = edgar_cache.json_cache.read(url)
+            if content is not None:
+                return _cached_response(url, content, meta.get('content_type'))
+        request_headers.update(edgar_cache.json_cache.conditional_headers(meta))
+
+    response = _send(url, request_headers, timeout, **kwargs)
+
+    if archive_key and response.status_code == 200:
+        edgar_cache.archive_cache.put(
+            *archive_key, response.content, response.headers.get('Content-Type', '')
+        )
+    elif revalidate:
+        if response.status_code == 304 and meta is not None:
+            content = edgar_cache.json_cache.read(url)
+            if content is not None:
+                edgar_cache.json_cache.refresh(url, meta, response.headers)
+                return _cached_response(url, content, meta.get('content_type'))
+            # Body vanished under us; fetch it again unconditionally
+            return get(url, headers=headers, timeout=timeout, user_agent=user_agent,
+                       use_cache=False, **kwargs)
+        if response.status_code == 200:
+            edgar_cache.json_cache.put(url, response.content, response.headers)
+    return response
+
+
+def get_json(url, **kwargs):
+    """GET a JSON document, raising requests.HTTPError on a non-2xx status"""
+    response = get(url, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+
+async def aget(url, **kwargs):
+    """Awaitable get() that runs on a worker thread and shares the same limiter"""
+    return await asyncio.to_thread(get, url, **kwargs)
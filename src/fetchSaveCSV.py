@@ -1,16 +1,15 @@
-import requests
 import json
 import csv
 
-# Define CIK and headers
+import edgar_client
+import holdings_store
+
+# Define CIK
 cik = "0001838359"
-headers = {
-    "User-Agent": "xhaxhilenzi@gmail.com"
-}
 
 # Fetch company facts data
 url = f"https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json"
-response = requests.get(url, headers=headers)
+response = edgar_client.get(url)
 
 # Check response status
 if response.status_code == 200:
@@ -47,5 +46,9 @@ if response.status_code == 200:
 
     print(f"Data saved successfully as {csv_filename}")
 
+    # Keep every fact in the local store as well
+    stored = holdings_store.HoldingsStore().load_company_facts(data)
+    print(f"Stored {stored} facts")
+
 else:
     print(f"Error: {response.status_code}, {response.text}")
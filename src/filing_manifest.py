@@ -0,0 +1,209 @@
+"""Per-accession manifests: which document in a filing is which.
+
+Finding the 13F information table used to mean downloading every .xml in
+index.json until one contained <infoTable>, usually starting with the
+primary_doc.xml cover page. The {accession}-index-headers.html page
+already lists every document with its SGML <TYPE> ("13F-HR",
+"INFORMATION TABLE", "4", ...), plus the filing date and acceptance time,
+so one small request tells us exactly which file to fetch. index.json
+(names and sizes) plus naming conventions are the fallback when the
+headers page is missing.
+
+Filed documents never change, so a resolved manifest is kept forever as
+SEC_CACHE_DIR/manifests/{accession}.json and later runs need no metadata
+request at all."""
+
+import html
+import json
+import os
+import re
+
+import edgar_cache
+import edgar_client
+
+ARCHIVE_URL = "https://www.sec.gov/Archives/edgar/data/{cik}/{accession}"
+MANIFEST_DIR = os.path.join(edgar_cache.CACHE_DIR, 'manifests')
+
+INFO_TABLE_TYPE = 'INFORMATION TABLE'
+
+_DOCUMENT = re.compile(r'<DOCUMENT>(.*?)(?=<DOCUMENT>|\Z)', re.S)
+_FIELD = re.compile(r'<(TYPE|FILENAME|DESCRIPTION)>([^<\r\n]*)')
+_FILING_DATE = re.compile(r'<FILING-DATE>(\d{8})')
+_ACCEPTANCE = re.compile(r'<ACCEPTANCE-DATETIME>(\d{14})')
+_INFO_TABLE_NAME = re.compile(r'info.?table|form13f.*\.xml$', re.I)
+
+
+def base_url(cik, accession_number):
+    """Archive directory URL of a filing"""
+    return ARCHIVE_URL.format(cik=int(cik), accession=accession_number.replace('-', ''))
+
+
+def _dashed(accession_number):
+    accession = accession_number.replace('-', '')
+    return f"{accession[:10]}-{accession[10:12]}-{accession[12:]}"
+
+
+def raw_document_name(primary_document):
+    """
+    File name of the raw document behind a submissions primaryDocument
+
+    XML forms (4, 13D/G, ...) are listed with their rendering stylesheet as a
+    path prefix, e.g. 'xslF345X05/form4.xml'; the raw XML is 'form4.xml'.
+    """
+    directory, _, name = primary_document.rpartition('/')
+    if directory.lower().startswith('xsl'):
+        return name
+    return primary_document
+
+
+def pick_document(documents, form_types, extension='.xml'):
+    """
+    Choose the main document of a filing by SGML type, falling back to the first file with extension
+
+    Returns:
+    str: File name, or None
+    """
+    wanted = {form_type.upper() for form_type in form_types}
+    files = [document for document in documents if document['name'].lower().endswith(extension)]
+    for document in files:
+        if (document.get('type') or '').upper() in wanted:
+            return document['name']
+    return files[0]['name'] if files else None
+
+
+def parse_index_headers(text):
+    """
+    Parse an {accession}-index-headers.html page
+
+    Returns:
+    tuple: (list of {'name', 'type', 'description'} dicts, filing date 'YYYY-MM-DD' or None,
+        acceptance datetime 'YYYY-MM-DDTHH:MM:SS' or None)
+    """
+    text = html.unescape(text)
+    documents = []
+    for block in _DOCUMENT.findall(text):
+        fields = {key: value.strip() for key, value in _FIELD.findall(block)}
+        if fields.get('FILENAME'):
+            documents.append({
+                'name': fields['FILENAME'],
+                'type': fields.get('TYPE'),
+                'description': fields.get('DESCRIPTION')
+            })
+
+    filing_date = _FILING_DATE.search(text)
+    if filing_date:
+        value = filing_date.group(1)
+        filing_date = f"{value[:4]}-{value[4:6]}-{value[6:]}"
+    accepted = _ACCEPTANCE.search(text)
+    if accepted:
+        value = accepted.group(1)
+        accepted = f"{value[:4]}-{value[4:6]}-{value[6:8]}T{value[8:10]}:{value[10:12]}:{value[12:]}"
+    return documents, filing_date, accepted
+
+
+def pick_info_table(documents):
+    """
+    Choose the 13F information table among a filing's documents
+
+    Uses the document type when known, otherwise the usual file names
+    (infotable.xml, form13fInfoTable.xml, ...) and finally the largest
+    .xml that is not the primary_doc.xml cover page.
+
+    Returns:
+    str: File name, or None if the filing has no candidate
+    """
+    for document in documents:
+        if (document.get('type') or '').upper() == INFO_TABLE_TYPE:
+            return document['name']
+
+    candidates = [
+        document for document in documents
+        if document['name'].lower().endswith('.xml') and document['name'].lower() != 'primary_doc.xml'
+    ]
+    for document in candidates:
+        if _INFO_TABLE_NAME.search(document['name']):
+            return document['name']
+    if not candidates:
+        return None
+    return max(candidates, key=lambda document: int(document.get('size') or 0))['name']
+
+
+def _fetch_documents(cik, accession_number, user_agent=None):
+    """Document list from index-headers, falling back to index.json"""
+    url = base_url(cik, accession_number)
+    response = edgar_client.get(f"{url}/{_dashed(accession_number)}-index-headers.html", user_agent=user_agent)
+    if response.status_code == 200:
+        documents, filing_date, accepted = parse_index_headers(response.text)
+        if documents:
+            return documents, filing_date, accepted
+
+    response = edgar_client.get(f"{url}/index.json", user_agent=user_agent)
+    if response.status_code != 200:
+        raise ValueError(f"Failed to fetch index: {response.status_code}")
+    items = response.json()['directory']['item']
+    documents = [{'name': item['name'], 'size': item.get('size') or 0} for item in items]
+    # index.json has no filing date; the first item's last-modified is the closest proxy
+    filing_date = items[0]['last-modified'].split(' ')[0] if items else None
+    return documents, filing_date, None
+
+
+def _manifest_path(accession_number):
+    return os.path.join(MANIFEST_DIR, f"{accession_number.replace('-', '')}.json")
+
+
+def get_manifest(cik, accession_number, user_agent=None, refresh=False):
+    """
+    Return the cached manifest of a filing, building it on first use
+
+    Parameters:
+    cik (str): Filer CIK (any CIK whose archive directory holds the filing)
+    accession_number (str): Accession number, with or without dashes
+    user_agent (str): Optional User-Agent override for the SEC request
+    refresh (bool): Rebuild even if a manifest is cached
+
+    Returns:
+    dict: {'cik', 'accession_number', 'filing_date', 'acceptance_datetime',
+        'documents', 'info_table'}
+    """
+    accession = accession_number.replace('-', '')
+    path = _manifest_path(accession)
+    if not refresh and os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    documents, filing_date, accepted = _fetch_documents(cik, accession, user_agent=user_agent)
+    manifest = {
+        'cik': str(cik).zfill(10),
+        'accession_number': accession,
+        'filing_date': filing_date,
+        'acceptance_datetime': accepted,
+        'documents': documents,
+        'info_table': pick_info_table(documents)
+    }
+    edgar_cache.write_atomic(path, json.dumps(manifest).encode('utf-8'))
+    return manifest
+
+
+def info_table_url(cik, accession_number, user_agent=None):
+    """
+    URL of a 13F filing's information table
+
+    Returns:
+    tuple: (URL or None, manifest)
+    """
+    manifest = get_manifest(cik, accession_number, user_agent=user_agent)
+    if not manifest['info_table']:
+        return None, manifest
+    return f"{base_url(cik, accession_number)}/{manifest['info_table']}", manifest
+
+
+# Example usage
+if __name__ == "__main__":
+    url, manifest = info_table_url("0001364742", "0001086364-24-008417")
+    print(f"Filing date: {manifest['filing_date']}")
+    for document in manifest['documents']:
+        print(f"- {document['name']} ({document.get('type')})")
+    print(f"Information table: {url}")
@@ -0,0 +1,116 @@
+"""HTML-to-text normalization for filing documents.
+
+13D/13G primary documents are mostly markup: inline styles, nested
+tables, &nbsp; entities. Running extractors over the raw HTML makes every
+pattern scan (and sometimes match inside) all of it. normalize() turns a
+document into compact text in one pass:
+
+    - <script>, <style>, <head> and comments are dropped
+    - a closing </td>/</th> becomes a tab, so table cells stay separated
+    - row and block tags (<tr>, <p>, <div>, <br>, ...) become newlines
+    - every other tag is removed and entities are decoded
+    - runs of spaces / blank lines are collapsed
+
+Normalized text is cached per accession and document under
+SEC_CACHE_DIR/filing-text (gzip, LRU bounded like the archive cache), so
+documents are normalized once and later runs skip both the raw download
+and the markup pass."""
+
+import html
+import os
+import re
+
+import edgar_cache
+import edgar_client
+
+TEXT_CACHE_MAX_BYTES = edgar_cache.ARCHIVE_CACHE_MAX_BYTES // 4
+
+_DROP = re.compile(r'<(script|style|head)\b.*?</\1\s*>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+_CELL = re.compile(r'</t[dh]\s*>', re.IGNORECASE)
+_BLOCK = re.compile(r'<(?:br|/?p|/?div|/?tr|/?table|/?h[1-6]|/?li|/?center|hr)\b[^>]*>', re.IGNORECASE)
+_TAG = re.compile(r'<[^>]*>')
+_SPACES = re.compile(r'[ \xa0\r\f\v]+')
+_TABS = re.compile(r' ?\t[ \t]*')
+_NEWLINES = re.compile(r'[ \t]*\n\s*')
+
+text_cache = edgar_cache.ArchiveCache(
+    directory=os.path.join(edgar_cache.CACHE_DIR, 'filing-text'), max_bytes=TEXT_CACHE_MAX_BYTES
+)
+
+
+def decode(content):
+    """Decode a raw document (UTF-8, falling back to Windows-1252)"""
+    if isinstance(content, str):
+        return content
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        return content.decode('cp1252', errors='replace')
+
+
+def normalize(content):
+    """
+    Convert an HTML (or plain text) filing document to compact text
+
+    Parameters:
+    content (bytes|str): Raw document
+
+    Returns:
+    str: Text with tabs between table cells and newlines between rows/blocks
+    """
+    text = _DROP.sub(' ', decode(content))
+    text = _CELL.sub('\t', text)
+    text = _BLOCK.sub('\n', text)
+    text = html.unescape(_TAG.sub(' ', text))
+    text = _SPACES.sub(' ', text)
+    text = _TABS.sub('\t', text)
+    return _NEWLINES.sub('\n', text).strip()
+
+
+def cached_text(url):
+    """Normalized text of a filing document if it is cached, else None"""
+    key = edgar_cache.parse_archive_url(url)
+    if key is None:
+        return None
+    cached = text_cache.get(*key)
+    return cached[0].decode('utf-8') if cached is not None else None
+
+
+def store_text(url, text):
+    """Cache normalized text for a filing document URL; returns the text"""
+    key = edgar_cache.parse_archive_url(url)
+    if key is not None:
+        text_cache.put(*key, text.encode('utf-8'), 'text/plain; charset=utf-8')
+    return text
+
+
+def get_text(url, user_agent=None):
+    """
+    Normalized text of a filing document, fetching and normalizing it on a cache miss
+
+    Parameters:
+    url (str): Archive document URL
+    user_agent (str): Optional User-Agent override for the SEC request
+
+    Returns:
+    str: Normalized text
+    """
+    text = cached_text(url)
+    if text is not None:
+        return text
+
+    response = edgar_client.get(url, user_agent=user_agent)
+    response.raise_for_status()
+    return store_text(url, normalize(response.content))
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "primary_doc.htm"
+    with open(path, 'rb') as f:
+        raw = f.read()
+    text = normalize(raw)
+    print(f"{len(raw)} bytes -> {len(text)} characters")
+    print(text[:2000])
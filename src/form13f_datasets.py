@@ -0,0 +1,149 @@
+"""Load SEC's quarterly Form 13F data sets as an alternative holdings source.
+
+The SEC publishes every quarter's 13F filings as one zip
+(https://www.sec.gov/data-research/sec-markets-data/form-13f-data-sets)
+holding tab-separated tables keyed by ACCESSION_NUMBER:
+
+    SUBMISSION.tsv   CIK, SUBMISSIONTYPE, FILING_DATE, PERIODOFREPORT
+    COVERPAGE.tsv    FILINGMANAGER_NAME, REPORTCALENDARORQUARTER, ...
+    INFOTABLE.tsv    one row per holding (NAMEOFISSUER, CUSIP, VALUE, SSHPRNAMT, ...)
+
+Members are streamed straight out of the archive in chunks, so a quarter
+(~3M holdings) loads without extracting the zip or holding the raw text in
+memory, and comes out in the same schema get_13f_holdings produces (text
+columns as categoricals, int64 value/shares)."""
+
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+HOLDING_COLUMNS = [
+    'nameOfIssuer', 'titleOfClass', 'cusip', 'value', 'shares', 'shareType',
+    'investmentDiscretion', 'filingCik', 'accessionNumber', 'filingDate', 'portfolioPercent',
+    'periodOfReport'
+]
+
+# Low-cardinality text columns kept as categoricals, as in infotable.HoldingsBuilder
+_CATEGORICAL = ['nameOfIssuer', 'titleOfClass', 'cusip', 'shareType', 'investmentDiscretion',
+                'filingCik', 'accessionNumber', 'filingDate', 'periodOfReport']
+
+_INFOTABLE_COLUMNS = {
+    'ACCESSION_NUMBER': 'accessionNumber',
+    'NAMEOFISSUER': 'nameOfIssuer',
+    'TITLEOFCLASS': 'titleOfClass',
+    'CUSIP': 'cusip',
+    'VALUE': 'value',
+    'SSHPRNAMT': 'shares',
+    'SSHPRNAMTTYPE': 'shareType',
+    'INVESTMENTDISCRETION': 'investmentDiscretion'
+}
+
+
+def _member(archive, name):
+    """Find a table in the zip regardless of folder prefix or case"""
+    for info in archive.infolist():
+        if os.path.basename(info.filename).upper() == name.upper():
+            return info
+    raise KeyError(f"{name} not found in {archive.filename}")
+
+
+def read_submissions(archive, forms=('13F-HR', '13F-HR/A')):
+    """
+    Read SUBMISSION.tsv (and manager names from COVERPAGE.tsv)
+
+    Returns:
+    pandas.DataFrame: indexed by accessionNumber (dashes removed) with
+        filingCik, filingDate, periodOfReport, submissionType, filingManager
+    """
+    with archive.open(_member(archive, 'SUBMISSION.tsv')) as f:
+        submissions = pd.read_csv(f, sep='\t', dtype=str, keep_default_na=False)
+    if forms:
+        submissions = submissions[submissions['SUBMISSIONTYPE'].isin(forms)]
+
+    frame = pd.DataFrame({
+        'accessionNumber': submissions['ACCESSION_NUMBER'].str.replace('-', '', regex=False),
+        'filingCik': submissions['CIK'].str.zfill(10),
+        'filingDate': pd.to_datetime(submissions['FILING_DATE'], format='%d-%b-%Y').dt.strftime('%Y-%m-%d'),
+        'periodOfReport': pd.to_datetime(submissions['PERIODOFREPORT'], format='%d-%b-%Y').dt.strftime('%Y-%m-%d'),
+        'submissionType': submissions['SUBMISSIONTYPE']
+    })
+
+    try:
+        with archive.open(_member(archive, 'COVERPAGE.tsv')) as f:
+            cover = pd.read_csv(f, sep='\t', dtype=str, keep_default_na=False,
+                                usecols=['ACCESSION_NUMBER', 'FILINGMANAGER_NAME'])
+        cover['accessionNumber'] = cover['ACCESSION_NUMBER'].str.replace('-', '', regex=False)
+        frame = frame.merge(
+            cover[['accessionNumber', 'FILINGMANAGER_NAME']].rename(columns={'FILINGMANAGER_NAME': 'filingManager'}),
+            on='accessionNumber', how='left'
+        )
+    except KeyError:
+        frame['filingManager'] = None
+
+    return frame.set_index('accessionNumber')
+
+
+def load_13f_dataset(zip_path, forms=('13F-HR', '13F-HR/A'), ciks=None, chunksize=500_000):
+    """
+    Load a Form 13F data set zip into the get_13f_holdings schema
+
+    Parameters:
+    zip_path (str): Local path of the quarterly data set zip
+    forms (tuple): Submission types to keep (13F-NT notices carry no holdings)
+    ciks (list): Optional filer CIKs to keep; everything else is dropped while streaming
+    chunksize (int): INFOTABLE rows parsed per chunk
+
+    Returns:
+    pandas.DataFrame: nameOfIssuer, titleOfClass, cusip, value, shares, shareType,
+        investmentDiscretion, filingCik, accessionNumber, filingDate, portfolioPercent,
+        periodOfReport, sorted by filing then value (descending)
+    """
+    with zipfile.ZipFile(zip_path) as archive:
+        submissions = read_submissions(archive, forms)
+        if ciks is not None:
+            wanted = {str(cik).zfill(10) for cik in ciks}
+            submissions = submissions[submissions['filingCik'].isin(wanted)]
+        accessions = set(submissions.index)
+
+        chunks = []
+        with archive.open(_member(archive, 'INFOTABLE.tsv')) as f:
+            reader = pd.read_csv(
+                f, sep='\t', usecols=list(_INFOTABLE_COLUMNS), dtype=str,
+                keep_default_na=False, chunksize=chunksize
+            )
+            for chunk in reader:
+                chunk = chunk.rename(columns=_INFOTABLE_COLUMNS)
+                chunk['accessionNumber'] = chunk['accessionNumber'].str.replace('-', '', regex=False)
+                chunk = chunk[chunk['accessionNumber'].isin(accessions)]
+                if chunk.empty:
+                    continue
+                chunk['value'] = pd.to_numeric(chunk['value'], errors='coerce').fillna(0).astype(np.int64)
+                chunk['shares'] = pd.to_numeric(chunk['shares'], errors='coerce').fillna(0).astype(np.int64)
+                chunks.append(chunk)
+
+    if not chunks:
+        return pd.DataFrame(columns=HOLDING_COLUMNS)
+
+    holdings = pd.concat(chunks, ignore_index=True)
+    holdings = holdings.join(submissions[['filingCik', 'filingDate', 'periodOfReport']], on='accessionNumber')
+
+    totals = holdings.groupby('accessionNumber')['value'].transform('sum')
+    holdings['portfolioPercent'] = (holdings['value'] / totals.where(totals != 0) * 100).round(4)
+
+    holdings = holdings.sort_values(['accessionNumber', 'value'], ascending=[True, False], kind='stable')
+    holdings = holdings[HOLDING_COLUMNS].reset_index(drop=True)
+    for name in _CATEGORICAL:
+        holdings[name] = holdings[name].astype('category')
+    return holdings
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+
+    zip_path = sys.argv[1] if len(sys.argv) > 1 else "2024q3_form13f.zip"
+    holdings = load_13f_dataset(zip_path)
+    print(f"Loaded {len(holdings)} holdings from {holdings['accessionNumber'].nunique()} filings")
+    print(holdings.head(10).to_string(index=False))
@@ -0,0 +1,263 @@
+"""Bulk filing discovery from EDGAR's quarterly full-index files.
+
+https://www.sec.gov/Archives/edgar/full-index/{year}/QTR{n}/master.idx (and
+form.idx) list every filing of a quarter with its form type, CIK, filing date
+and path. Ingesting them into a local SQLite table turns questions such as
+"every 13F-HR filed in 2024Q3" into one indexed query instead of thousands of
+per-filer submissions requests.
+
+Index files are read from a local directory when given one, otherwise
+downloaded once and kept gzip-compressed under SEC_CACHE_DIR/full-index."""
+
+import gzip
+import io
+import os
+import re
+import sqlite3
+import time
+
+import pandas as pd
+
+import edgar_cache
+import edgar_client
+
+FULL_INDEX_URL = "https://www.sec.gov/Archives/edgar/full-index/{year}/QTR{quarter}/{name}"
+FULL_INDEX_DB = os.path.join(edgar_cache.CACHE_DIR, 'full_index.sqlite')
+FULL_INDEX_CACHE_DIR = os.path.join(edgar_cache.CACHE_DIR, 'full-index')
+
+_ACCESSION = re.compile(r'(\d{10}-\d{2}-\d{6})')
+_FORM_IDX_ROW = re.compile(r'^(.+?)\s{2,}(.+?)\s{2,}(\d+)\s+(\d{4}-?\d{2}-?\d{2})\s+(\S+)\s*$')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS filings (
+    form TEXT NOT NULL,
+    cik INTEGER NOT NULL,
+    company TEXT,
+    date_filed TEXT NOT NULL,
+    accession TEXT NOT NULL,
+    filename TEXT,
+    year INTEGER NOT NULL,
+    quarter INTEGER NOT NULL,
+    PRIMARY KEY (accession, cik)
+);
+CREATE INDEX IF NOT EXISTS ix_filings_form_date ON filings (form, date_filed);
+CREATE INDEX IF NOT EXISTS ix_filings_period_form ON filings (year, quarter, form);
+CREATE INDEX IF NOT EXISTS ix_filings_cik_form ON filings (cik, form);
+CREATE TABLE IF NOT EXISTS loaded_quarters (
+    year INTEGER NOT NULL,
+    quarter INTEGER NOT NULL,
+    source TEXT,
+    row_count INTEGER,
+    loaded_at REAL,
+    PRIMARY KEY (year, quarter)
+);
+"""
+
+
+def _normalize_date(value):
+    return value if '-' in value else f"{value[:4]}-{value[4:6]}-{value[6:8]}"
+
+
+def parse_master_idx(lines):
+    """
+    Parse master.idx rows ("CIK|Company Name|Form Type|Date Filed|Filename")
+
+    Yields:
+    tuple: (form, cik, company, date_filed, accession, filename)
+    """
+    in_body = False
+    for line in lines:
+        if not in_body:
+            in_body = line.startswith('-----')
+            continue
+        parts = line.rstrip('\r\n').split('|')
+        if len(parts) != 5 or not parts[0].isdigit():
+            continue
+        cik, company, form, date_filed, filename = parts
+        match = _ACCESSION.search(filename)
+        if match:
+            yield form, int(cik), company, _normalize_date(date_filed), match.group(1), filename
+
+
+def parse_form_idx(lines):
+    """
+    Parse fixed-width form.idx rows ("Form Type  Company Name  CIK  Date Filed  File Name")
+
+    Yields:
+    tuple: (form, cik, company, date_filed, accession, filename)
+    """
+    in_body = False
+    for line in lines:
+        if not in_body:
+            in_body = line.startswith('-----')
+            continue
+        match = _FORM_IDX_ROW.match(line)
+        if not match:
+            continue
+        form, company, cik, date_filed, filename = match.groups()
+        accession = _ACCESSION.search(filename)
+        if accession:
+            yield form.strip(), int(cik), company.strip(), _normalize_date(date_filed), accession.group(1), filename
+
+
+def _open_lines(path):
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='latin-1')
+    return open(path, 'r', encoding='latin-1')
+
+
+def _find_local_file(source_dir, year, quarter, name):
+    """Look for {name} under source_dir/{year}/QTR{n}/ or flat as source_dir/{name}"""
+    for candidate in (
+        os.path.join(source_dir, str(year), f"QTR{quarter}", name),
+        os.path.join(source_dir, f"{year}QTR{quarter}", name),
+        os.path.join(source_dir, name),
+    ):
+        for path in (candidate, candidate + '.gz'):
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def download_index_file(year, quarter, name='master.idx', refresh=False):
+    """Return the cached copy of a full-index file, downloading it on first use"""
+    path = os.path.join(FULL_INDEX_CACHE_DIR, str(year), f"QTR{quarter}", name + '.gz')
+    if os.path.exists(path) and not refresh:
+        return path
+
+    response = edgar_client.get(FULL_INDEX_URL.format(year=year, quarter=quarter, name=name), timeout=60)
+    response.raise_for_status()
+    edgar_cache.write_atomic(path, gzip.compress(response.content, compresslevel=6))
+    return path
+
+
+class FullIndex:
+    """SQLite table of (form, cik, date, accession) built from full-index files"""
+
+    def __init__(self, path=FULL_INDEX_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def loaded_quarters(self):
+        return self.conn.execute(
+            "SELECT year, quarter FROM loaded_quarters ORDER BY year, quarter"
+        ).fetchall()
+
+    def ingest_file(self, path, year, quarter):
+        """
+        Replace the rows of one quarter with the contents of a master.idx or form.idx file
+
+        Returns:
+        int: Number of rows loaded
+        """
+        parse = parse_form_idx if os.path.basename(path).startswith('form') else parse_master_idx
+        with _open_lines(path) as lines:
+            rows = [row + (year, quarter) for row in parse(lines)]
+
+        with self.conn:
+            self.conn.execute("DELETE FROM filings WHERE year = ? AND quarter = ?", (year, quarter))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO filings "
+                "(form, cik, company, date_filed, accession, filename, year, quarter) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO loaded_quarters VALUES (?, ?, ?, ?, ?)",
+                (year, quarter, path, len(rows), time.time())
+            )
+        return len(rows)
+
+    def ingest_quarter(self, year, quarter, source_dir=None, refresh=False):
+        """
+        Load one quarter, from source_dir when given, otherwise from the download cache
+
+        Parameters:
+        year (int): Calendar year
+        quarter (int): 1-4
+        source_dir (str): Directory holding master.idx/form.idx files
+        refresh (bool): Reload even if the quarter was already ingested
+
+        Returns:
+        int: Number of rows loaded (0 if the quarter was already present)
+        """
+        if not refresh and (year, quarter) in self.loaded_quarters():
+            return 0
+
+        path = None
+        if source_dir is not None:
+            path = (_find_local_file(source_dir, year, quarter, 'master.idx')
+                    or _find_local_file(source_dir, year, quarter, 'form.idx'))
+            if path is None:
+                raise FileNotFoundError(f"No master.idx/form.idx for {year}Q{quarter} in {source_dir}")
+        else:
+            path = download_index_file(year, quarter, refresh=refresh)
+
+        loaded = self.ingest_file(path, year, quarter)
+        print(f"Loaded {loaded} filings for {year}Q{quarter}")
+        return loaded
+
+    def ingest_range(self, start_year, end_year, source_dir=None, refresh=False):
+        """Load every quarter from start_year through end_year (quarters not yet published are skipped)"""
+        total = 0
+        for year in range(start_year, end_year + 1):
+            for quarter in range(1, 5):
+                try:
+                    total += self.ingest_quarter(year, quarter, source_dir=source_dir, refresh=refresh)
+                except Exception as e:
+                    print(f"Skipping {year}Q{quarter}: {str(e)}")
+        return total
+
+    def query(self, forms=None, cik=None, year=None, quarter=None, since=None, until=None):
+        """
+        Select filings from the local table
+
+        Parameters:
+        forms (list): Exact form types (e.g. ['13F-HR', '13F-HR/A'])
+        cik (str|int): Filer or subject company CIK
+        year (int), quarter (int): Index period
+        since (str), until (str): 'YYYY-MM-DD' bounds on the filing date
+
+        Returns:
+        pandas.DataFrame: columns form, cik, company, date_filed, accession, filename, year, quarter
+        """
+        clauses = []
+        params = []
+        if forms:
+            clauses.append(f"form IN ({','.join('?' * len(forms))})")
+            params.extend(forms)
+        if cik is not None:
+            clauses.append("cik = ?")
+            params.append(int(cik))
+        if year is not None:
+            clauses.append("year = ?")
+            params.append(year)
+        if quarter is not None:
+            clauses.append("quarter = ?")
+            params.append(quarter)
+        if since is not None:
+            clauses.append("date_filed >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("date_filed <= ?")
+            params.append(until)
+
+        sql = "SELECT form, cik, company, date_filed, accession, filename, year, quarter FROM filings"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY date_filed DESC, accession"
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+
+# Example usage
+if __name__ == "__main__":
+    index = FullIndex()
+    index.ingest_quarter(2024, 3)
+    filings = index.query(forms=['13F-HR'], year=2024, quarter=3)
+    print(f"{len(filings)} 13F-HR filings in 2024Q3")
+    print(filings.head().to_string(index=False))
@@ -0,0 +1,277 @@
+"""Indexed, fuzzy-searchable resolver over EDGAR's cik-lookup-data.txt.
+
+cik-lookup-data.txt lists every entity name (including former names) that has
+filed with EDGAR as "NAME:CIK:" lines. It is streamed to disk once, and turned
+into a set of numpy arrays under SEC_CACHE_DIR/fund_index:
+
+    names.npy / name_offsets.npy   original names (utf-8) and their offsets
+    ciks.npy                       CIK of every name
+    tri_ptr.npy / tri_post.npy     trigram -> name ids (CSR postings list)
+    tri_count.npy                  number of distinct trigrams per name
+
+The arrays are loaded memory-mapped, so opening the index is instant and a
+query only touches the postings of its own trigrams. Matches are ranked by
+trigram Dice similarity over normalized names (legal suffixes such as INC,
+LLC, LP removed), with deterministic tie-breaking."""
+
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+import edgar_cache
+import edgar_client
+
+CIK_LOOKUP_URL = "https://www.sec.gov/Archives/edgar/cik-lookup-data.txt"
+FUND_INDEX_DIR = os.path.join(edgar_cache.CACHE_DIR, 'fund_index')
+FUND_INDEX_MAX_AGE = 7 * 24 * 60 * 60  # rebuild weekly
+
+_SUFFIXES = frozenset([
+    'THE', 'INC', 'INCORPORATED', 'CORP', 'CORPORATION', 'CO', 'COMPANY',
+    'LLC', 'L', 'P', 'LP', 'LLP', 'LTD', 'LIMITED', 'PLC', 'SA', 'NV', 'AG'
+])
+
+# Trigram alphabet: space, A-Z, 0-9 -> 37 symbols
+_ALPHABET = 37
+_N_TRIGRAMS = _ALPHABET ** 3
+_SYMBOL = np.zeros(256, dtype=np.int64)
+for _i, _c in enumerate(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', start=1):
+    _SYMBOL[_c] = _i
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def normalize_name(name):
+    """Uppercase, keep alphanumeric tokens and drop legal-form suffixes"""
+    tokens = re.findall(r'[A-Z0-9]+', name.upper().replace('&', ' AND '))
+    kept = [token for token in tokens if token not in _SUFFIXES]
+    return ' '.join(kept or tokens)
+
+
+def _padded(keys):
+    return [b' ' + key.encode('ascii') + b' ' for key in keys]
+
+
+def _trigram_codes(key):
+    """Distinct trigram codes of a normalized name"""
+    padded = _padded([key])[0]
+    symbols = _SYMBOL[np.frombuffer(padded, dtype=np.uint8)]
+    if len(symbols) < 3:
+        return np.empty(0, dtype=np.int64)
+    return np.unique((symbols[:-2] * _ALPHABET + symbols[1:-1]) * _ALPHABET + symbols[2:])
+
+
+def download_cik_lookup(path):
+    """Stream cik-lookup-data.txt to path without holding it in memory"""
+    response = edgar_client.get(CIK_LOOKUP_URL, stream=True, timeout=60)
+    response.raise_for_status()
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    finally:
+        response.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _read_lookup_file(path):
+    """Parse "NAME:CIK:" lines into (names, ciks)"""
+    names = []
+    ciks = []
+    with open(path, 'r', encoding='latin-1') as f:
+        for line in f:
+            parts = line.rstrip('\r\n').rsplit(':', 2)
+            if len(parts) < 2 or not parts[1].isdigit():
+                continue
+            names.append(parts[0].strip())
+            ciks.append(int(parts[1]))
+    return names, ciks
+
+
+def build_fund_index(source_path=None, directory=FUND_INDEX_DIR):
+    """
+    Build the on-disk index
+
+    Parameters:
+    source_path (str): Local copy of cik-lookup-data.txt; downloaded when omitted
+    directory (str): Where to write the index
+
+    Returns:
+    FundIndex: The freshly built index, opened memory-mapped
+    """
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    if source_path is None:
+        source_path = os.path.join(parent, 'cik-lookup-data.txt')
+        download_cik_lookup(source_path)
+
+    names, ciks = _read_lookup_file(source_path)
+    n = len(names)
+    keys = [normalize_name(name) for name in names]
+
+    # Vectorized trigram extraction over all padded keys at once
+    padded = _padded(keys)
+    lengths = np.fromiter(map(len, padded), dtype=np.int64, count=n)
+    symbols = _SYMBOL[np.frombuffer(b''.join(padded), dtype=np.uint8)]
+    codes = (symbols[:-2] * _ALPHABET + symbols[1:-1]) * _ALPHABET + symbols[2:]
+
+    per_name = np.maximum(lengths - 2, 0)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    first = np.concatenate(([0], np.cumsum(per_name)[:-1]))
+    name_of = np.repeat(np.arange(n, dtype=np.int64), per_name)
+    positions = np.repeat(starts, per_name) + (np.arange(per_name.sum()) - np.repeat(first, per_name))
+
+    pairs = np.unique(name_of * _N_TRIGRAMS + codes[positions])
+    pair_names = pairs // _N_TRIGRAMS
+    pair_codes = pairs % _N_TRIGRAMS
+
+    order = np.argsort(pair_codes, kind='stable')
+    tri_post = pair_names[order].astype(np.int32)
+    tri_ptr = np.zeros(_N_TRIGRAMS + 1, dtype=np.int64)
+    tri_ptr[1:] = np.cumsum(np.bincount(pair_codes, minlength=_N_TRIGRAMS))
+    tri_count = np.bincount(pair_names, minlength=n).astype(np.int16)
+
+    encoded = [name.encode('utf-8') for name in names]
+    name_offsets = np.zeros(n + 1, dtype=np.int64)
+    name_offsets[1:] = np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=n))
+
+    build_dir = tempfile.mkdtemp(dir=parent, prefix='.fund_index-')
+    try:
+        np.save(os.path.join(build_dir, 'names.npy'), np.frombuffer(b''.join(encoded), dtype=np.uint8))
+        np.save(os.path.join(build_dir, 'name_offsets.npy'), name_offsets)
+        np.save(os.path.join(build_dir, 'ciks.npy'), np.asarray(ciks, dtype=np.int64))
+        np.save(os.path.join(build_dir, 'tri_ptr.npy'), tri_ptr)
+        np.save(os.path.join(build_dir, 'tri_post.npy'), tri_post)
+        np.save(os.path.join(build_dir, 'tri_count.npy'), tri_count)
+        if os.path.exists(directory):
+            shutil.rmtree(directory)
+        os.replace(build_dir, directory)
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+
+    return FundIndex(directory)
+
+
+class FundIndex:
+    """Memory-mapped trigram index over EDGAR entity names"""
+
+    def __init__(self, directory=FUND_INDEX_DIR):
+        self.directory = directory
+        load = lambda name: np.load(os.path.join(directory, name), mmap_mode='r')
+        self.names = load('names.npy')
+        self.name_offsets = load('name_offsets.npy')
+        self.ciks = load('ciks.npy')
+        self.tri_ptr = load('tri_ptr.npy')
+        self.tri_post = load('tri_post.npy')
+        self.tri_count = load('tri_count.npy')
+
+    def __len__(self):
+        return len(self.ciks)
+
+    def name(self, i):
+        start, end = self.name_offsets[i], self.name_offsets[i + 1]
+        return self.names[start:end].tobytes().decode('utf-8')
+
+    def search(self, fund_name, k=10, min_score=0.0):
+        """
+        Ranked fuzzy matches for a fund name
+
+        Parameters:
+        fund_name (str): Name to resolve (e.g., "Vanguard Group")
+        k (int): Number of distinct CIKs to return
+        min_score (float): Drop matches with a lower Dice similarity (0-1)
+
+        Returns:
+        list: [{'cik', 'name', 'score'}] best first; ties are broken by an exact
+            (case-insensitive) name match, then closest name length, then lowest
+            CIK, so results are deterministic
+        """
+        query = _trigram_codes(normalize_name(fund_name))
+        if len(query) == 0:
+            return []
+
+        postings = [self.tri_post[self.tri_ptr[c]:self.tri_ptr[c + 1]] for c in query]
+        ids, shared = np.unique(np.concatenate(postings), return_counts=True)
+        if len(ids) == 0:
+            return []
+
+        counts = self.tri_count[ids].astype(np.int64)
+        scores = 2.0 * shared / (len(query) + counts)
+        keep = scores >= min_score
+        ids, scores, counts = ids[keep], scores[keep], counts[keep]
+
+        # Several names can share a CIK (former names), so over-fetch before deduping
+        limit = min(len(ids), k * 8)
+        if limit < len(ids):
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            ids, scores, counts = ids[top], scores[top], counts[top]
+
+        ciks = np.asarray(self.ciks[ids])
+        names = [self.name(int(i)) for i in ids]
+        wanted = fund_name.strip().upper()
+        inexact = np.array([name.upper() != wanted for name in names])
+        order = np.lexsort((ciks, np.abs(counts - len(query)), inexact, -scores))
+
+        results = []
+        seen = set()
+        for i in order:
+            cik = int(ciks[i])
+            if cik in seen:
+                continue
+            seen.add(cik)
+            results.append({
+                'cik': str(cik).zfill(10),
+                'name': names[i],
+                'score': round(float(scores[i]), 4)
+            })
+            if len(results) == k:
+                break
+        return results
+
+    def resolve(self, fund_name, min_score=0.5):
+        """Best match for a fund name, or None if nothing scores at least min_score"""
+        matches = self.search(fund_name, k=1, min_score=min_score)
+        return matches[0] if matches else None
+
+
+def get_fund_index(refresh=False):
+    """Return the process-wide FundIndex, building it when missing or older than a week"""
+    global _index
+    with _index_lock:
+        marker = os.path.join(FUND_INDEX_DIR, 'tri_count.npy')
+        try:
+            age = time.time() - os.path.getmtime(marker)
+        except OSError:
+            age = None
+
+        if refresh or age is None or age > FUND_INDEX_MAX_AGE:
+            try:
+                _index = build_fund_index()
+                return _index
+            except Exception:
+                # Keep serving a stale index rather than failing the lookup
+                if age is None:
+                    raise
+        if _index is None:
+            _index = FundIndex()
+        return _index
+
+
+def search_funds(fund_name, k=10):
+    """Top-k fuzzy matches for a fund name"""
+    return get_fund_index().search(fund_name, k=k)
+
+
+def resolve_fund_cik(fund_name):
+    """10-digit CIK of the best match for a fund name, or None"""
+    match = get_fund_index().resolve(fund_name)
+    return match['cik'] if match else None
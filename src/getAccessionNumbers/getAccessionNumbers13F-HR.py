@@ -1,23 +1,19 @@
-import requests
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import submissions
 
 def get_accession_numbers(cik, form_type='13F-HR'):
     cik = str(cik).zfill(10)
-    url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-    
-    headers = {'User-Agent': "xhaxhilenzi@gmail.com"}
-    response = requests.get(url, headers=headers)
-    
-    if response.status_code == 200:
-        filings = response.json().get('filings', {}).get('recent', {})
-        accession_numbers = [
-            filings['accessionNumber'][i]
-            for i, form in enumerate(filings.get('form', []))
-            if form == form_type
-        ]
-        return accession_numbers
-    else:
+    try:
+        table = submissions.load_submissions(cik)
+    except Exception:
         print("Failed to fetch data")
         return []
+    
+    return table.filings(forms=[form_type])['accessionNumber'].tolist()
 
 # Example: Get 13F-HR accession numbers for BlackRock Inc.
 cik = "0001364742"  # BlackRock Inc.
@@ -0,0 +1,558 @@
+"""Local SQLite (or PostgreSQL) store for everything the scrapers produce.
+
+Results used to end up in one-off CSVs, so every follow-up question meant
+fetching again. HoldingsStore keeps them in one normalized database:
+
+    filers              cik, name, kind
+    filings             accession, filer_cik, issuer_cik, form, filing_date, period, ...
+    holdings_13f        one row per 13F information table entry
+    positions_13dg      one row per 13D/13G reporting person
+    form4_transactions  one row per Form 4 table row (derivative flag)
+    facts               companyfacts values in long format
+    watermarks          last accession and acceptance time synced per (cik, form)
+
+with indexes on (cusip, period) and (filer_cik, period) for holdings and
+(issuer_cik, date) for 13D/G positions, Form 4 transactions and facts,
+so cross-fund questions ("who held this CUSIP last quarter") are local
+queries. The load_* methods take the DataFrames the scrapers already
+return; reloading a filing replaces its rows.
+
+Configuration (environment or .env file):
+    SEC_STORE_URL   SQLAlchemy URL of the database, SQLite or PostgreSQL
+                    (default sqlite:///SEC_CACHE_DIR/holdings.sqlite)"""
+
+import os
+import re
+import time
+
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import (
+    BigInteger, Boolean, Column, Float, Index, Integer, MetaData, String, Table, Text,
+    create_engine, delete, event, select
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import edgar_cache
+
+load_dotenv()
+
+STORE_URL = os.getenv(
+    'SEC_STORE_URL', f"sqlite:///{os.path.join(edgar_cache.CACHE_DIR, 'holdings.sqlite')}"
+)
+
+# Dialects whose insert supports on_conflict_do_nothing / on_conflict_do_update
+_INSERTS = {
+    'sqlite': sqlite_insert,
+    'postgresql': postgresql_insert,
+}
+
+metadata = MetaData()
+
+filers = Table(
+    'filers', metadata,
+    Column('cik', String(10), primary_key=True),
+    Column('name', Text),
+    Column('kind', String(16)),
+    Column('updated_at', Float),
+)
+
+filings = Table(
+    'filings', metadata,
+    Column('accession', String(18), primary_key=True),
+    Column('filer_cik', String(10)),
+    Column('issuer_cik', String(10)),
+    Column('form', String(32), nullable=False),
+    Column('filing_date', String(10)),
+    Column('period', String(10)),
+    Column('acceptance_datetime', String(32)),
+    Column('primary_doc', Text),
+    Index('ix_filings_filer_form_date', 'filer_cik', 'form', 'filing_date'),
+    Index('ix_filings_issuer_form_date', 'issuer_cik', 'form', 'filing_date'),
+)
+
+holdings_13f = Table(
+    'holdings_13f', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('accession', String(18), nullable=False),
+    Column('filer_cik', String(10), nullable=False),
+    Column('period', String(10)),
+    Column('filing_date', String(10)),
+    Column('name_of_issuer', Text),
+    Column('title_of_class', Text),
+    Column('cusip', String(9)),
+    Column('value', BigInteger),
+    Column('shares', BigInteger),
+    Column('share_type', String(8)),
+    Column('investment_discretion', String(8)),
+    Column('portfolio_percent', Float),
+    Index('ix_holdings_cusip_period', 'cusip', 'period'),
+    Index('ix_holdings_filer_period', 'filer_cik', 'period'),
+    Index('ix_holdings_accession', 'accession'),
+)
+
+positions_13dg = Table(
+    'positions_13dg', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('accession', String(18), nullable=False),
+    Column('issuer_cik', String(10)),
+    Column('ticker', String(16)),
+    Column('investor', Text),
+    Column('form', String(32)),
+    Column('date', String(10)),
+    Column('percent', Float),
+    Column('shares', BigInteger),
+    Column('sole_voting', BigInteger),
+    Column('shared_voting', BigInteger),
+    Column('source_of_funds', String(32)),
+    Column('document_url', Text),
+    Index('ix_positions_issuer_date', 'issuer_cik', 'date'),
+    Index('ix_positions_accession', 'accession'),
+)
+
+form4_transactions = Table(
+    'form4_transactions', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('accession', String(18), nullable=False),
+    Column('issuer_cik', String(10)),
+    Column('owner_cik', String(10)),
+    Column('owner_name', Text),
+    Column('officer_title', Text),
+    Column('form', String(8)),
+    Column('filing_date', String(10)),
+    Column('date', String(10)),
+    Column('derivative', Boolean, nullable=False),
+    Column('security_title', Text),
+    Column('transaction_code', String(4)),
+    Column('shares', Float),
+    Column('price', Float),
+    Column('acquired_disposed', String(1)),
+    Column('shares_after', Float),
+    Column('ownership', String(1)),
+    Column('exercise_price', Float),
+    Column('expiration_date', String(10)),
+    Column('underlying_security', Text),
+    Column('underlying_shares', Float),
+    Index('ix_form4_issuer_date', 'issuer_cik', 'date'),
+    Index('ix_form4_owner_date', 'owner_cik', 'date'),
+    Index('ix_form4_accession', 'accession'),
+)
+
+facts = Table(
+    'facts', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('cik', String(10), nullable=False),
+    Column('taxonomy', String(32)),
+    Column('concept', Text, nullable=False),
+    Column('unit', String(32)),
+    Column('start', String(10)),
+    Column('end', String(10)),
+    Column('val', Float),
+    Column('accn', String(20)),
+    Column('fy', Integer),
+    Column('fp', String(4)),
+    Column('form', String(32)),
+    Column('filed', String(10)),
+    Column('frame', String(16)),
+    Index('ix_facts_cik_end', 'cik', 'end'),
+    Index('ix_facts_concept_end', 'concept', 'end'),
+)
+
+watermarks = Table(
+    'watermarks', metadata,
+    Column('cik', String(10), primary_key=True),
+    Column('form', String(32), primary_key=True),
+    Column('accession', String(18), nullable=False),
+    Column('acceptance_datetime', String(32)),
+    Column('filing_date', String(10)),
+    Column('updated_at', Float),
+)
+
+_ARCHIVE_CIK = re.compile(r'/Archives/edgar/data/(\d+)/(\d{18})/')
+
+
+def _cik(value):
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    value = str(value).strip()
+    return value.zfill(10) if value.isdigit() else None
+
+
+def _accession(value):
+    return str(value).replace('-', '')
+
+
+def _number(value):
+    """Float from Form 4 style text ('1,000', 'N/A', '') or None"""
+    if value is None:
+        return None
+    try:
+        return float(str(value).replace(',', '').replace('$', ''))
+    except ValueError:
+        return None
+
+
+def _int(value):
+    value = _number(value)
+    return int(value) if value is not None and value == value else None
+
+
+def _text(value):
+    if value is None or (isinstance(value, float) and pd.isna(value)) or value == 'N/A':
+        return None
+    return str(value)
+
+
+def report_period(filing_date):
+    """Quarter end before a 13F filing date, used when the report period is not known"""
+    date = pd.Timestamp(filing_date)
+    return (date - pd.offsets.QuarterEnd(1)).strftime('%Y-%m-%d')
+
+
+def _records(frame, columns):
+    """DataFrame -> list of dicts with NaN/NaT replaced by None"""
+    frame = frame[list(columns)].astype(object)
+    frame = frame.where(pd.notna(frame), None)
+    return [dict(zip(columns, row)) for row in frame.itertuples(index=False, name=None)]
+
+
+class HoldingsStore:
+    """SQLAlchemy-backed local store; tables and indexes are created on first use"""
+
+    def __init__(self, url=STORE_URL):
+        if url.startswith('sqlite:///'):
+            os.makedirs(os.path.dirname(os.path.abspath(url[len('sqlite:///'):])), exist_ok=True)
+        self.engine = create_engine(url)
+        dialect = self.engine.dialect.name
+        if dialect not in _INSERTS:
+            raise ValueError(f"Unsupported store database '{dialect}' (use SQLite or PostgreSQL)")
+        self._insert = _INSERTS[dialect]
+        if dialect == 'sqlite':
+            event.listen(self.engine, 'connect', _sqlite_pragmas)
+        metadata.create_all(self.engine)
+
+    def close(self):
+        self.engine.dispose()
+
+    def _insert_ignore(self, conn, table, rows):
+        if rows:
+            conn.execute(self._insert(table).on_conflict_do_nothing(), rows)
+
+    def _replace(self, conn, table, key, values, rows):
+        """Delete the rows of the given accessions (or CIKs), then bulk insert"""
+        values = list(values)
+        for i in range(0, len(values), 500):
+            conn.execute(delete(table).where(table.c[key].in_(values[i:i + 500])))
+        if rows:
+            conn.execute(table.insert(), rows)
+
+    def upsert_filers(self, rows, kind=None):
+        """
+        Insert or update filers
+
+        Parameters:
+        rows (list): dicts with 'cik' and 'name'
+        kind (str): 'fund', 'company' or 'insider'
+        """
+        rows = [
+            {'cik': _cik(row['cik']), 'name': row.get('name'), 'kind': row.get('kind', kind), 'updated_at': time.time()}
+            for row in rows if _cik(row.get('cik'))
+        ]
+        if not rows:
+            return
+        statement = self._insert(filers)
+        statement = statement.on_conflict_do_update(
+            index_elements=['cik'],
+            set_={'name': statement.excluded.name, 'kind': statement.excluded.kind,
+                  'updated_at': statement.excluded.updated_at}
+        )
+        with self.engine.begin() as conn:
+            conn.execute(statement, rows)
+
+    def add_filings(self, rows):
+        """
+        Record filings (existing accessions are left untouched)
+
+        Parameters:
+        rows (list): dicts with accession, filer_cik (None if unknown), form and optionally
+            issuer_cik, filing_date, period, acceptance_datetime, primary_doc
+        """
+        rows = [
+            {
+                'accession': _accession(row['accession']),
+                'filer_cik': _cik(row['filer_cik']),
+                'issuer_cik': _cik(row.get('issuer_cik')),
+                'form': row['form'],
+                'filing_date': row.get('filing_date'),
+                'period': row.get('period'),
+                'acceptance_datetime': row.get('acceptance_datetime'),
+                'primary_doc': row.get('primary_doc'),
+            }
+            for row in rows
+        ]
+        with self.engine.begin() as conn:
+            self._insert_ignore(conn, filings, rows)
+
+    def load_13f_holdings(self, holdings, form='13F-HR'):
+        """
+        Store holdings in the get_13f_holdings / load_13f_dataset schema
+
+        Parameters:
+        holdings (pandas.DataFrame): nameOfIssuer, titleOfClass, cusip, value, shares, shareType,
+            investmentDiscretion, filingCik, accessionNumber, filingDate, portfolioPercent
+            and optionally periodOfReport
+
+        Returns:
+        int: Rows written
+        """
+        if holdings.empty:
+            return 0
+        frame = pd.DataFrame({
+            'accession': holdings['accessionNumber'].astype(str).str.replace('-', '', regex=False),
+            'filer_cik': holdings['filingCik'].astype(str).str.zfill(10),
+            'filing_date': holdings['filingDate'].astype(str),
+            'name_of_issuer': holdings['nameOfIssuer'].astype(object),
+            'title_of_class': holdings['titleOfClass'].astype(object),
+            'cusip': holdings['cusip'].astype(object),
+            'value': holdings['value'],
+            'shares': holdings['shares'],
+            'share_type': holdings['shareType'].astype(object),
+            'investment_discretion': holdings['investmentDiscretion'].astype(object),
+            'portfolio_percent': holdings['portfolioPercent'] if 'portfolioPercent' in holdings else None,
+        })
+        if 'periodOfReport' in holdings:
+            frame['period'] = holdings['periodOfReport'].astype(str).values
+        else:
+            periods = {date: report_period(date) for date in frame['filing_date'].unique()}
+            frame['period'] = frame['filing_date'].map(periods)
+
+        filing_rows = (
+            frame[['accession', 'filer_cik', 'filing_date', 'period']]
+            .drop_duplicates('accession').assign(form=form).to_dict('records')
+        )
+        rows = _records(frame, [column.name for column in holdings_13f.columns if column.name != 'id'])
+        self.add_filings(filing_rows)
+        with self.engine.begin() as conn:
+            self._replace(conn, holdings_13f, 'accession', frame['accession'].unique(), rows)
+        return len(rows)
+
+    def load_13dg_positions(self, positions, filer_cik=None):
+        """
+        Store fetch_fund_positions / fetch_major_shareholders output
+
+        Accession and issuer CIK are taken from each row's Document URL. The
+        filing's filer_cik is left NULL unless filer_cik is given, since a
+        per-ticker scan does not know who filed each schedule.
+
+        Parameters:
+        positions (pandas.DataFrame): Investor (or Shareholder Name), Ticker, Form Type, Filing Date,
+            Document URL, Ownership %, Shares Owned, Sole/Shared Voting Power, Source of Funds
+        filer_cik (str): Fund CIK, when the positions were fetched fund-centrically
+
+        Returns:
+        int: Rows written
+        """
+        if positions.empty:
+            return 0
+        rows = []
+        for row in positions.to_dict('records'):
+            match = _ARCHIVE_CIK.search(row['Document URL'])
+            if not match:
+                continue
+            filing_date = row.get('Filing Date')
+            rows.append({
+                'accession': match.group(2),
+                'issuer_cik': match.group(1).zfill(10),
+                'ticker': _text(row.get('Ticker')),
+                'investor': _text(row.get('Investor', row.get('Shareholder Name'))),
+                'form': _text(row.get('Form Type')),
+                'date': pd.Timestamp(filing_date).strftime('%Y-%m-%d') if filing_date is not None else None,
+                'percent': _number(row.get('Ownership %')),
+                'shares': _int(row.get('Shares Owned')),
+                'sole_voting': _int(row.get('Sole Voting Power')),
+                'shared_voting': _int(row.get('Shared Voting Power')),
+                'source_of_funds': _text(row.get('Source of Funds')),
+                'document_url': row['Document URL'],
+            })
+
+        self.add_filings([
+            {'accession': row['accession'], 'filer_cik': filer_cik,
+             'issuer_cik': row['issuer_cik'], 'form': row['form'], 'filing_date': row['date']}
+            for row in rows
+        ])
+        with self.engine.begin() as conn:
+            self._replace(conn, positions_13dg, 'accession', {row['accession'] for row in rows}, rows)
+        return len(rows)
+
+    def load_form4_transactions(self, non_derivative, derivative):
+        """
+        Store get_form4_transactions_batch output
+
+        Parameters:
+        non_derivative (pandas.DataFrame), derivative (pandas.DataFrame): Tagged transaction tables
+
+        Returns:
+        int: Rows written
+        """
+        rows = []
+        for frame, is_derivative in ((non_derivative, False), (derivative, True)):
+            if frame is None or frame.empty:
+                continue
+            for row in frame.to_dict('records'):
+                rows.append({
+                    'accession': _accession(row['Accession Number']),
+                    'issuer_cik': _cik(row.get('Issuer CIK')),
+                    'owner_cik': _cik(row.get('Owner CIK')),
+                    'owner_name': _text(row.get('Owner Name')),
+                    'officer_title': _text(row.get('Officer Title')),
+                    'form': _text(row.get('Form Type')),
+                    'filing_date': _text(row.get('Filing Date')),
+                    'date': _text(row.get('Transaction Date')),
+                    'derivative': is_derivative,
+                    'security_title': _text(row.get('Security Title')),
+                    'transaction_code': _text(row.get('Transaction Code')),
+                    'shares': _number(row.get('Shares Traded')),
+                    'price': _number(row.get('Price per Share')),
+                    'acquired_disposed': _text(row.get('Transaction Type')),
+                    'shares_after': _number(row.get('Shares Owned After')),
+                    'ownership': _text(row.get('Ownership Type')),
+                    'exercise_price': _number(row.get('Exercise Price')),
+                    'expiration_date': _text(row.get('Expiration Date')),
+                    'underlying_security': _text(row.get('Underlying Security')),
+                    'underlying_shares': _number(row.get('Underlying Shares')),
+                })
+        if not rows:
+            return 0
+
+        filing_rows = {
+            row['accession']: {
+                'accession': row['accession'], 'filer_cik': row['owner_cik'] or row['issuer_cik'],
+                'issuer_cik': row['issuer_cik'], 'form': row['form'] or '4', 'filing_date': row['filing_date']
+            }
+            for row in rows
+        }
+        self.add_filings(filing_rows.values())
+        with self.engine.begin() as conn:
+            self._replace(conn, form4_transactions, 'accession', filing_rows, rows)
+        return len(rows)
+
+    def load_facts(self, frame):
+        """
+        Store a companyfacts_bulk long-format fact table; each CIK's facts are replaced
+
+        Returns:
+        int: Rows written
+        """
+        if frame.empty:
+            return 0
+        columns = [column.name for column in facts.columns if column.name != 'id']
+        rows = _records(frame.assign(cik=frame['cik'].astype(str).str.zfill(10)), columns)
+        if 'entityName' in frame:
+            names = frame[['cik', 'entityName']].drop_duplicates('cik').astype(str)
+            self.upsert_filers(
+                [{'cik': cik, 'name': name} for cik, name in names.itertuples(index=False, name=None)],
+                kind='company'
+            )
+        with self.engine.begin() as conn:
+            self._replace(conn, facts, 'cik', {row['cik'] for row in rows}, rows)
+        return len(rows)
+
+    def get_watermarks(self, cik):
+        """
+        Sync watermarks of a CIK
+
+        Returns:
+        dict: form -> {'accession', 'acceptance_datetime', 'filing_date'}
+        """
+        statement = select(watermarks).where(watermarks.c.cik == _cik(cik))
+        with self.engine.connect() as conn:
+            return {
+                row.form: {'accession': row.accession, 'acceptance_datetime': row.acceptance_datetime,
+                           'filing_date': row.filing_date}
+                for row in conn.execute(statement)
+            }
+
+    def set_watermark(self, cik, form, accession, acceptance_datetime=None, filing_date=None):
+        """Record the newest accession synced for (cik, form)"""
+        statement = self._insert(watermarks).values(
+            cik=_cik(cik), form=form, accession=_accession(accession),
+            acceptance_datetime=acceptance_datetime, filing_date=filing_date, updated_at=time.time()
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=['cik', 'form'],
+            set_={'accession': statement.excluded.accession,
+                  'acceptance_datetime': statement.excluded.acceptance_datetime,
+                  'filing_date': statement.excluded.filing_date,
+                  'updated_at': statement.excluded.updated_at}
+        )
+        with self.engine.begin() as conn:
+            conn.execute(statement)
+
+    def known_accessions(self, accessions):
+        """The subset of accessions already recorded in filings"""
+        accessions = [_accession(accession) for accession in accessions]
+        known = set()
+        with self.engine.connect() as conn:
+            for i in range(0, len(accessions), 500):
+                statement = select(filings.c.accession).where(filings.c.accession.in_(accessions[i:i + 500]))
+                known.update(conn.execute(statement).scalars())
+        return known
+
+    def load_company_facts(self, data):
+        """
+        Store one parsed companyfacts JSON (api/xbrl/companyfacts); the CIK's facts are replaced
+
+        Returns:
+        int: Rows written
+        """
+        import companyfacts_bulk
+
+        return self.load_facts(companyfacts_bulk.columns_to_frame(companyfacts_bulk.flatten_company_facts(data)))
+
+    def query(self, statement, params=None):
+        """Run a SQL string or SQLAlchemy selectable and return a DataFrame"""
+        with self.engine.connect() as conn:
+            return pd.read_sql(statement, conn, params=params)
+
+    def holders(self, cusip, period=None):
+        """Every 13F filer holding a CUSIP, largest position first"""
+        statement = (
+            select(holdings_13f.c.filer_cik, filers.c.name, holdings_13f.c.period,
+                   holdings_13f.c.shares, holdings_13f.c.value, holdings_13f.c.portfolio_percent)
+            .select_from(holdings_13f.outerjoin(filers, filers.c.cik == holdings_13f.c.filer_cik))
+            .where(holdings_13f.c.cusip == cusip)
+            .order_by(holdings_13f.c.period.desc(), holdings_13f.c.value.desc())
+        )
+        if period is not None:
+            statement = statement.where(holdings_13f.c.period == period)
+        return self.query(statement)
+
+    def filer_history(self, filer_cik):
+        """A filer's 13F holdings across every stored period"""
+        statement = (
+            select(holdings_13f)
+            .where(holdings_13f.c.filer_cik == str(filer_cik).zfill(10))
+            .order_by(holdings_13f.c.period.desc(), holdings_13f.c.value.desc())
+        )
+        return self.query(statement)
+
+
+def _sqlite_pragmas(dbapi_connection, _):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+
+    store = HoldingsStore()
+    if len(sys.argv) > 1:
+        import form13f_datasets
+
+        holdings = form13f_datasets.load_13f_dataset(sys.argv[1])
+        print(f"Stored {store.load_13f_holdings(holdings)} holdings")
+    print(store.holders("037833100").head(20).to_string(index=False))
@@ -1,9 +1,12 @@
-import requests
 import pandas as pd
 from datetime import datetime
-import time
 import json
-import re
+
+import cover_page
+import filing_manifest
+import holdings_store
+import submissions
+import ticker_index
 
 class SECAPIException(Exception):
     pass
@@ -20,105 +23,55 @@ def fetch_major_shareholders(ticker):
     pandas.DataFrame: Major shareholders data
     """
     
-    headers = {
-        'User-Agent': 'xhaxhilenzi@gmail.com',  # Replace with your information
-        'Accept-Encoding': 'gzip, deflate'
-    }
-    
     def get_cik(ticker):
         """Get CIK number from ticker"""
         try:
-            response = requests.get(
-                "https://www.sec.gov/files/company_tickers.json",
-                headers=headers,
-                timeout=10
-            )
-            response.raise_for_status()
-            
-            companies = response.json()
-            for entry in companies.values():
-                if entry['ticker'] == ticker.upper():
-                    return str(entry['cik_str']).zfill(10)
-            raise SECAPIException(f"Could not find CIK for ticker {ticker}")
-            
+            cik = ticker_index.get_cik(ticker)
         except Exception as e:
             raise SECAPIException(f"Error fetching CIK: {str(e)}")
+        
+        if cik is None:
+            raise SECAPIException(f"Could not find CIK for ticker {ticker}")
+        return cik
 
     def fetch_ownership_filings(cik):
         """Fetch 13G/13D filings for the company"""
         try:
-            url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            filings = []
-            
-            if 'filings' in data and 'recent' in data['filings']:
-                forms = data['filings']['recent']
-                
-                # Look for both 13G and 13D filings
-                for idx, form_type in enumerate(forms.get('form', [])):
-                    if any(f in form_type for f in ['13G', '13D']):
-                        filings.append({
-                            'form_type': form_type,
-                            'filing_date': forms['filingDate'][idx],
-                            'accession_number': forms['accessionNumber'][idx],
-                            'primary_doc': forms['primaryDocument'][idx]
-                        })
-            
-            return filings
+            # Look for both 13G and 13D filings across the full history
+            return submissions.load_submissions(cik).records(
+                form_filter=lambda form_type: '13G' in form_type or '13D' in form_type
+            )
             
         except Exception as e:
             raise SECAPIException(f"Error fetching filings: {str(e)}")
 
     def process_filing(filing, cik):
-        """Extract ownership information from filing"""
+        """Extract ownership information from filing, one row per reporting person"""
         try:
-            # Construct document URL
+            # Construct document URL (raw XML for structured filings, not the XSL view)
             accession = filing['accession_number'].replace('-', '')
-            doc_url = f"https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/{filing['primary_doc']}"
-            
-            time.sleep(0.1)  # Respect SEC rate limits
-            response = requests.get(doc_url, headers=headers, timeout=10)
-            
-            if response.status_code != 200:
-                return None
-                
-            content = response.text.upper()  # Convert to upper case for easier searching
+            primary_doc = filing_manifest.raw_document_name(filing['primary_doc'])
+            doc_url = f"https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/{primary_doc}"
             
-            # Extract ownership information
-            ownership_info = {
-                'Form Type': filing['form_type'],
-                'Filing Date': filing['filing_date'],
-                'Document URL': doc_url
-            }
+            results = []
+            for person in cover_page.parse_document(doc_url):
+                ownership_info = {
+                    'Form Type': filing['form_type'],
+                    'Filing Date': filing['filing_date'],
+                    'Document URL': doc_url,
+                    'Shareholder Name': person['name']
+                }
+                if 'percent' in person:
+                    ownership_info['Ownership %'] = person['percent']
+                if 'aggregate' in person:
+                    ownership_info['Shares Owned'] = person['aggregate']
+                if 'sole_voting' in person:
+                    ownership_info['Sole Voting Power'] = person['sole_voting']
+                if 'shared_voting' in person:
+                    ownership_info['Shared Voting Power'] = person['shared_voting']
+                results.append(ownership_info)
             
-            # Extract shareholder name
-            name_start = content.find('NAME OF REPORTING PERSON')
-            if name_start != -1:
-                name_end = content.find('\n', name_start)
-                ownership_info['Shareholder Name'] = content[name_start:name_end].split('>')[-1].strip()
-            
-            # Extract ownership percentage
-            ownership_start = content.find('PERCENT OF CLASS REPRESENTED')
-            if ownership_start != -1:
-                ownership_end = content.find('\n', ownership_start)
-                percentage_text = content[ownership_start:ownership_end]
-                numbers = re.findall(r'\d+\.?\d*', percentage_text)
-                if numbers:
-                    ownership_info['Ownership %'] = float(numbers[0])
-            
-            # Extract number of shares
-            shares_start = content.find('SHARES BENEFICIALLY OWNED')
-            if shares_start != -1:
-                shares_end = content.find('\n', shares_start)
-                shares_text = content[shares_start:shares_end]
-                numbers = re.findall(r'\d+', shares_text)
-                if numbers:
-                    ownership_info['Shares Owned'] = int(numbers[0])
-            
-            return ownership_info
+            return results
             
         except Exception as e:
             print(f"Error processing filing: {str(e)}")
@@ -139,7 +92,7 @@ def fetch_major_shareholders(ticker):
             print(f"Processing {filing['form_type']} filing from {filing['filing_date']}...")
             result = process_filing(filing, cik)
             if result:
-                ownership_data.append(result)
+                ownership_data.extend(result)
         
         if ownership_data:
             # Create DataFrame and sort by filing date
@@ -174,5 +127,8 @@ if __name__ == "__main__":
         output_file = f"{ticker}_major_shareholders.csv"
         shareholders.to_csv(output_file, index=False)
         print(f"\nData saved to {output_file}")
+        
+        stored = holdings_store.HoldingsStore().load_13dg_positions(shareholders.assign(Ticker=ticker))
+        print(f"Stored {stored} positions")
     else:
         print("No major shareholders data found.")
\ No newline at end of file
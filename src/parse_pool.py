@@ -0,0 +1,94 @@
+"""Process pool for CPU-bound document parsing.
+
+Fetching is network-bound and already concurrent (edgar_client), but
+regex extraction of 13D/13G text and XML parsing of large 13F information
+tables are CPU-bound and hold the GIL. ParsePool runs them in worker
+processes: the fetch stage submits raw document bytes and keeps fetching
+while the workers parse.
+
+Only the top-level functions below are submitted, so everything crossing
+the process boundary is picklable (bytes in; lists, dicts and
+HoldingsBuilder buffers out).
+
+Configuration (environment or .env file):
+    SEC_PARSE_WORKERS   Worker processes (default: os.cpu_count()); 0 or 1 parses
+                        inline in the calling process"""
+
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from dotenv import load_dotenv
+
+import cover_page
+import filing_text
+import infotable
+
+load_dotenv()
+
+PARSE_WORKERS = int(os.getenv('SEC_PARSE_WORKERS', str(os.cpu_count() or 1)))
+
+
+def parse_13f(content, metadata):
+    """
+    Parse one 13F information table
+
+    Returns:
+    infotable.HoldingsBuilder: Holdings of the filing, tagged with metadata
+    """
+    builder = infotable.HoldingsBuilder()
+    builder.add_filing(content, skip_unnamed=True, **metadata)
+    return builder
+
+
+def parse_13dg(content):
+    """
+    Parse one 13D/13G primary document
+
+    Returns:
+    tuple: (reporting persons, normalized text to cache, or None for structured XML)
+    """
+    persons = cover_page.parse_structured(content)
+    if persons is not None:
+        return persons, None
+    text = filing_text.normalize(content)
+    return cover_page.scan(text), text
+
+
+def parse_13dg_text(text):
+    """Scan already-normalized 13D/13G text"""
+    return cover_page.scan(text)
+
+
+class ParsePool:
+    """
+    Executor that parse functions are submitted to
+
+    Usable as a context manager. With workers <= 1 functions run inline and
+    submit() returns an already completed future, which keeps call sites
+    identical when a process pool is not wanted.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = PARSE_WORKERS if workers is None else workers
+        self._executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+
+    def submit(self, fn, *args):
+        if self._executor is not None:
+            return self._executor.submit(fn, *args)
+
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
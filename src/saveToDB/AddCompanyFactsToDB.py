@@ -1,137 +1,336 @@
-import requests
+"""Write SEC companyfacts into Firestore, one collection per company.
+
+Layout:
+    sec_data_{cik}/{label}__{year}   One period year of a concept: label, description,
+                                     year and units -> entries (end, val, filed, form,
+                                     fy, fp, accn). year is the calendar year of the
+                                     period end; fy/fp are the fiscal year and period
+                                     of the filing that reported the value, so prior-
+                                     year comparatives land in their own period's shard.
+                                     Filing URLs are derived on read (filing_urls), not
+                                     stored.
+    sec_data_latest/{cik}            Latest value per concept and unit, for dashboards
+                                     that only need current metrics in one get
+
+Sharding by period year keeps documents far below Firestore's 1 MiB limit
+for long-lived filers and lets readers fetch only the periods they need.
+
+One Firebase app and Firestore client are created per process (get_db), so
+any number of CIKs can be loaded in one run. Documents go through a
+BulkWriter, which commits in parallel under Firestore's ramp-up limits and
+retries failed writes. Every document carries a hash of its content in
+_hash, written together with the content; on the next run the hashes are
+read back as a projection and unchanged documents are not written again,
+so reruns only touch what SEC actually changed.
+
+Configuration (environment or .env file):
+    FIREBASE_SERVICE_ACCOUNT   Service account JSON (default: serviceAccount.json next to this file)
+    FIRESTORE_EMULATOR_HOST    host:port of a local Firestore emulator; no credentials are needed
+    FIRESTORE_PROJECT_ID       Project used with the emulator (default: demo-sec-data)
+    FIRESTORE_MAX_ATTEMPTS     Attempts per document write before giving up (default: 5)"""
+
+import hashlib
 import json
-from firebase_admin import credentials, firestore, initialize_app
 import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import firebase_admin
+from dotenv import load_dotenv
+from firebase_admin import credentials, firestore, initialize_app
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import edgar_client
+
+load_dotenv()
+
+SERVICE_ACCOUNT_PATH = os.getenv(
+    'FIREBASE_SERVICE_ACCOUNT', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'serviceAccount.json')
+)
+EMULATOR_PROJECT_ID = os.getenv('FIRESTORE_PROJECT_ID', 'demo-sec-data')
+MAX_ATTEMPTS = int(os.getenv('FIRESTORE_MAX_ATTEMPTS', '5'))
+HASH_FIELD = '_hash'
+LATEST_COLLECTION = 'sec_data_latest'
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def get_db():
+    """
+    Firestore client shared by the whole process
+
+    With FIRESTORE_EMULATOR_HOST set the client talks to the emulator with
+    anonymous credentials; otherwise the default Firebase app is initialized
+    once from the service account.
+    """
+    global _db
+    with _db_lock:
+        if _db is None:
+            if os.getenv('FIRESTORE_EMULATOR_HOST'):
+                from google.auth.credentials import AnonymousCredentials
+                from google.cloud import firestore as cloud_firestore
+
+                _db = cloud_firestore.Client(project=EMULATOR_PROJECT_ID, credentials=AnonymousCredentials())
+            else:
+                try:
+                    app = firebase_admin.get_app()
+                except ValueError:
+                    app = initialize_app(credentials.Certificate(SERVICE_ACCOUNT_PATH))
+                _db = firestore.client(app)
+        return _db
+
 
 def generate_edgar_url(cik, accession_number, form_type):
     """Generate SEC EDGAR URL for the filing."""
     # Remove dashes from accession number if present
     accession_clean = accession_number.replace('-', '')
-    
+
     # Base URL for document views
     view_url = f"https://www.sec.gov/Archives/edgar/data/{cik}/{accession_clean}/{accession_number}-index.htm"
-    
+
     # Interactive URL for certain forms (10-K, 10-Q, 8-K)
     interactive_forms = ['10-K', '10-Q', '8-K']
     interactive_url = f"https://www.sec.gov/ix?doc=/Archives/edgar/data/{cik}/{accession_clean}/{accession_number}.htm" if form_type in interactive_forms else None
-    
+
     return {
         "view_url": view_url,
         "interactive_url": interactive_url
     }
 
-def fetch_and_store_sec_data(cik):
-    # Get the directory where your script is located
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    service_account_path = os.path.join(current_dir, 'serviceAccount.json')
-    
-    # Initialize Firebase Admin SDK
-    cred = credentials.Certificate(service_account_path)
-    initialize_app(cred)
-    
-    # Initialize Firestore client
-    db = firestore.client()
-    
-    # Strip leading zeros from CIK for URLs
-    cik_stripped = cik.lstrip('0')
-    
-    # Define headers
-    headers = {
-        "User-Agent": "xhaxhilenzi@gmail.com"
-    }
-    
-    # Fetch company facts data
+def filing_urls(cik, entry):
+    """EDGAR URLs of the filing a stored entry came from"""
+    if not entry.get('accn'):
+        return {}
+    return generate_edgar_url(str(cik).lstrip('0'), entry['accn'], entry.get('form', 'N/A'))
+
+def document_id(label, year=None):
+    """Create a valid document ID from a label (and period year shard)"""
+    doc_id = str(label).replace('/', '_').replace('.', '_')
+    return doc_id if year is None else f"{doc_id}__{year}"
+
+def build_documents(data, cik):
+    """
+    Turn a companyfacts JSON into Firestore documents, one per label and period year
+
+    Parameters:
+    data (dict): Parsed companyfacts JSON
+    cik (str): Company CIK
+
+    Returns:
+    dict: document ID -> document
+    """
+    # Track processed labels to merge data for same metrics
+    processed_data = {}
+
+    for taxonomy, items in data.get("facts", {}).items():
+        for metric, details in items.items():
+            # Use metric as fallback if label is None
+            label = details.get("label") or metric
+            description = details.get('description') or metric
+
+            # Skip if we somehow still have a None label
+            if label is None:
+                print(f"Skipping entry with None label in taxonomy {taxonomy}")
+                continue
+
+            # Process all units and their values
+            for unit, values in details.get("units", {}).items():
+                for entry in values:
+                    # Shard by the year the period ends in, not the filing's fiscal year
+                    year = (entry.get('end') or '')[:4] or 'NA'
+                    doc_id = document_id(label, year)
+                    if doc_id not in processed_data:
+                        processed_data[doc_id] = {
+                            'label': label,
+                            'description': description,
+                            'year': year,
+                            'units': {}
+                        }
+
+                    processed_data[doc_id]['units'].setdefault(unit, []).append({
+                        'end': entry.get('end', 'N/A'),
+                        'val': entry.get('val', 'N/A'),
+                        'filed': entry.get('filed', 'N/A'),
+                        'form': entry.get('form', 'N/A'),
+                        'fy': entry.get('fy', 'N/A'),
+                        'fp': entry.get('fp', 'N/A'),
+                        'accn': entry.get('accn', '')
+                    })
+
+    return processed_data
+
+def build_latest(data, cik):
+    """
+    Latest reported value of every concept and unit
+
+    Returns:
+    dict: {'cik', 'entityName', 'metrics': {label ID: {unit: entry}}}
+    """
+    metrics = {}
+    for items in data.get("facts", {}).values():
+        for metric, details in items.items():
+            label = details.get("label") or metric
+            for unit, values in details.get("units", {}).items():
+                if not values:
+                    continue
+                # Most recent period end, then the most recent filing reporting it
+                entry = max(values, key=lambda value: (value.get('end', ''), value.get('filed', '')))
+                metrics.setdefault(document_id(label), {})[unit] = {
+                    'label': label,
+                    'end': entry.get('end', 'N/A'),
+                    'val': entry.get('val', 'N/A'),
+                    'filed': entry.get('filed', 'N/A'),
+                    'form': entry.get('form', 'N/A'),
+                    'fy': entry.get('fy', 'N/A'),
+                    'fp': entry.get('fp', 'N/A'),
+                    'accn': entry.get('accn', '')
+                }
+    return {'cik': cik, 'entityName': data.get('entityName'), 'metrics': metrics}
+
+def content_hash(document):
+    """Stable content hash of a document (64-bit SHA-256 prefix, enough to detect changes)"""
+    encoded = json.dumps(document, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+def fetch_company_facts(cik):
+    """Fetch the companyfacts JSON of a CIK, or None on any error"""
     url = f"https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json"
-    response = requests.get(url, headers=headers)
-    
-    # Check response status
-    if response.status_code == 200:
-        data = response.json()
-        batch = db.batch()
-        
-        # Create a collection reference
-        collection_ref = db.collection(f'sec_data_{cik}')
-        
-        # Track processed labels to merge data for same metrics
-        processed_data = {}
-        
-        for taxonomy, items in data.get("facts", {}).items():
-            for metric, details in items.items():
-                # Use metric as fallback if label is None
-                label = details.get("label") or metric
-                description = details.get('description') or metric
-                
-                # Skip if we somehow still have a None label
-                if label is None:
-                    print(f"Skipping entry with None label in taxonomy {taxonomy}")
+    try:
+        response = edgar_client.get(url)
+        if response.status_code != 200:
+            print(f"Error: {response.status_code}, {response.text}")
+            return None
+        return response.json()
+    except Exception as e:
+        print(f"Error fetching company facts for {cik}: {str(e)}")
+        return None
+
+def store_company_facts(ciks, max_workers=4, force=False):
+    """
+    Fetch and store companyfacts for many CIKs, writing only changed documents
+
+    Parameters:
+    ciks (str|list): CIK or list of CIKs
+    max_workers (int): companyfacts documents fetched concurrently
+    force (bool): Write every document even if its hash is unchanged (stale documents are
+        still deleted)
+
+    Returns:
+    dict: CIK -> documents written (None if the facts could not be fetched)
+    """
+    if isinstance(ciks, str):
+        ciks = [ciks]
+    ciks = [str(cik).zfill(10) for cik in ciks]
+
+    db = get_db()
+    writer = db.bulk_writer()
+
+    # Retry transient failures; a document whose write still fails keeps its
+    # old _hash and is rewritten on the next run
+    writer.on_write_error(lambda error, bulk_writer: error.attempts < MAX_ATTEMPTS)
+
+    results = {}
+    try:
+        _write_company_facts(db, writer, ciks, max_workers, force, results)
+    finally:
+        # Flush whatever was queued for the CIKs processed so far, even if the run stops part way
+        writer.close()
+
+    return results
+
+def _stored_hashes(collection_ref):
+    """document ID -> _hash of every document in a collection, read as a projection"""
+    return {
+        snapshot.id: (snapshot.to_dict() or {}).get(HASH_FIELD)
+        for snapshot in collection_ref.select([HASH_FIELD]).stream()
+    }
+
+def _write_company_facts(db, writer, ciks, max_workers, force, results):
+    """Queue changed documents of every CIK on the BulkWriter"""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Fetch in bounded chunks so only a few companyfacts documents are in memory at once
+        for start in range(0, len(ciks), max_workers * 2):
+            chunk = ciks[start:start + max_workers * 2]
+            for cik, data in zip(chunk, executor.map(fetch_company_facts, chunk)):
+                if data is None:
+                    results[cik] = None
                     continue
-                
-                if label not in processed_data:
-                    processed_data[label] = {
-                        'description': description,
-                        'units': {}
-                    }
-                
-                # Process all units and their values
-                for unit, values in details.get("units", {}).items():
-                    if unit not in processed_data[label]['units']:
-                        processed_data[label]['units'][unit] = []
-                    
-                    # Add all entries for this unit
-                    for entry in values:
-                        # Get accession number from the filing data
-                        accession_number = entry.get('accn', '')
-                        form_type = entry.get('form', 'N/A')
-                        
-                        # Generate URLs if we have an accession number
-                        filing_urls = generate_edgar_url(cik_stripped, accession_number, form_type) if accession_number else {}
-                        
-                        entry_data = {
-                            'end': entry.get('end', 'N/A'),
-                            'val': entry.get('val', 'N/A'),
-                            'filed': entry.get('filed', 'N/A'),
-                            'form': form_type,
-                            'fy': entry.get('fy', 'N/A'),
-                            'fp': entry.get('fp', 'N/A'),
-                            'accn': accession_number,
-                            'filing_urls': filing_urls
-                        }
-                        processed_data[label]['units'][unit].append(entry_data)
-        
-        # Now write the processed data to Firestore
-        count = 0
-        batch_size = 500
-        
-        for label, data in processed_data.items():
-            try:
-                # Create a valid document ID from the label
-                doc_id = str(label).replace('/', '_').replace('.', '_')
-                
-                # Add document to batch
-                doc_ref = collection_ref.document(doc_id)
-                batch.set(doc_ref, data)
-                count += 1
-                
-                # If batch size limit is reached, commit and start new batch
-                if count >= batch_size:
-                    batch.commit()
-                    batch = db.batch()
-                    count = 0
-            except Exception as e:
-                print(f"Error processing label {label}: {str(e)}")
-                continue
-        
-        # Commit any remaining documents in the final batch
-        if count > 0:
-            batch.commit()
-            
-        print(f"Data successfully stored in Firestore collection: sec_data_{cik}")
-        return True
+
+                collection_ref = db.collection(f'sec_data_{cik}')
+                latest_ref = db.collection(LATEST_COLLECTION).document(cik)
+                previous = _stored_hashes(collection_ref)
+                latest_hash = (latest_ref.get(field_paths=[HASH_FIELD]).to_dict() or {}).get(HASH_FIELD)
+
+                targets = [
+                    (collection_ref.document(doc_id), document, previous.get(doc_id))
+                    for doc_id, document in build_documents(data, cik).items()
+                ]
+                targets.append((latest_ref, build_latest(data, cik), latest_hash))
+
+                count = 0
+                for doc_ref, document, stored_hash in targets:
+                    digest = content_hash(document)
+                    if force or stored_hash != digest:
+                        writer.set(doc_ref, dict(document, **{HASH_FIELD: digest}))
+                        count += 1
+
+                # Shards of labels or years SEC no longer reports
+                for doc_id in previous.keys() - {doc_ref.id for doc_ref, _, _ in targets}:
+                    writer.delete(collection_ref.document(doc_id))
+
+                results[cik] = count
+                print(f"{cik}: {count} of {len(targets)} documents changed")
+
+def get_concept(cik, label, years=None):
+    """
+    Read a concept back from Firestore, with filing URLs derived from each accession
+
+    Parameters:
+    cik (str): Company CIK
+    label (str): Concept label as stored
+    years (list): Period-end years to read (default: every stored year)
+
+    Returns:
+    dict: unit -> entries (each with 'filing_urls'), oldest period first
+    """
+    cik = str(cik).zfill(10)
+    collection_ref = get_db().collection(f'sec_data_{cik}')
+    if years is not None:
+        snapshots = [collection_ref.document(document_id(label, year)).get() for year in years]
     else:
-        print(f"Error: {response.status_code}, {response.text}")
+        snapshots = collection_ref.where(filter=FieldFilter('label', '==', label)).stream()
+
+    units = {}
+    for snapshot in snapshots:
+        document = snapshot.to_dict()
+        if not document:
+            continue
+        for unit, entries in document['units'].items():
+            units.setdefault(unit, []).extend(
+                dict(entry, filing_urls=filing_urls(cik, entry)) for entry in entries
+            )
+    for entries in units.values():
+        entries.sort(key=lambda entry: (entry['end'], entry['filed']))
+    return units
+
+def get_latest(cik):
+    """Latest value per concept and unit for a CIK, in one document read"""
+    return get_db().collection(LATEST_COLLECTION).document(str(cik).zfill(10)).get().to_dict()
+
+def fetch_and_store_sec_data(cik):
+    """Store one company's facts in Firestore collection sec_data_{cik}"""
+    written = store_company_facts([cik]).get(str(cik).zfill(10))
+    if written is None:
         return False
+    print(f"Data successfully stored in Firestore collection: sec_data_{str(cik).zfill(10)}")
+    return True
 
 # Usage
 if __name__ == "__main__":
-    cik = "0001838359"
-    fetch_and_store_sec_data(cik)
\ No newline at end of file
+    ciks = sys.argv[1:] or ["0001838359"]
+    results = store_company_facts(ciks)
+    print(f"Wrote {sum(count or 0 for count in results.values())} documents for {len(results)} companies")
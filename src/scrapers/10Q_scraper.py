@@ -1,34 +1,28 @@
-import requests
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import pandas as pd
 
+import edgar_client
+import ticker_index
+
 def get_company_financials(ticker, email):
     """
     Fetches the latest financial data for a given company (by ticker) from SEC's XBRL API.
     Returns recent 10-Q filing metadata and key financial metrics.
     """
-    headers = {'User-Agent': email}
-
-    # Step 1: Get all company tickers
-    tickers_url = "https://www.sec.gov/files/company_tickers.json"
-    tickers_response = requests.get(tickers_url, headers=headers)
-    tickers_data = tickers_response.json()
-
-    # Convert to DataFrame
-    tickers_df = pd.DataFrame.from_dict(tickers_data, orient="index")
-
-    # Find the CIK for the given ticker
-    company = tickers_df[tickers_df['ticker'] == ticker.upper()]
-    if company.empty:
+    # Step 1: Look up the CIK in the shared ticker index
+    cik = ticker_index.get_cik(ticker)
+    if cik is None:
         raise ValueError(f"Ticker '{ticker}' not found in SEC database.")
 
-    cik = str(company.iloc[0]['cik_str']).zfill(10)  # Ensure 10-digit CIK
-
     print(f"🔍 Found CIK: {cik} for {ticker.upper()}")
 
     # Step 2: Fetch recent filings
     filings_url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-    filings_response = requests.get(filings_url, headers=headers)
-    filings_data = filings_response.json()
+    filings_data = edgar_client.get_json(filings_url, user_agent=email)
 
     # Extract latest 10-Q
     filings_df = pd.DataFrame.from_dict(filings_data['filings']['recent'])
@@ -45,8 +39,7 @@ def get_company_financials(ticker, email):
 
     # Step 3: Get financial data using SEC XBRL API
     company_facts_url = f"https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json"
-    company_facts_response = requests.get(company_facts_url, headers=headers)
-    company_facts_data = company_facts_response.json()
+    company_facts_data = edgar_client.get_json(company_facts_url, user_agent=email)
 
 
 
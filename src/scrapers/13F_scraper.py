@@ -1,13 +1,20 @@
 # file for tracking institutional investors and their holdings
 # cik = 0001364742 - BlackRock Inc.
 
-import requests
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import pandas as pd
-import xml.etree.ElementTree as ET
-import time
 from datetime import datetime
 
-def get_13f_holdings(cik, accession_number, email):
+import edgar_client
+import filing_manifest
+import holdings_store
+import infotable
+
+def get_13f_holdings(cik, accession_number, email, filing_date=None):
     """
     Fetch and parse 13F holdings from a specific SEC filing.
 
@@ -15,26 +22,18 @@ def get_13f_holdings(cik, accession_number, email):
     cik (str): Company CIK
     accession_number (str): Filing accession number
     email (str): Email for SEC request header
+    filing_date (str): Filing date from the submissions metadata, if already known
 
     Returns:
     tuple: (pandas.DataFrame, dict) containing holding information and filing metadata
     """
-    headers = {'User-Agent': email}
     accession_number = accession_number.replace('-', '')
     cik = str(cik).zfill(10)
-    base_url = f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/{accession_number}"
     
     try:
-        # Fetch index.json for filing metadata
-        index_url = f"{base_url}/index.json"
-        index_response = requests.get(index_url, headers=headers)
-        if index_response.status_code != 200:
-            raise ValueError(f"Failed to fetch index: {index_response.status_code}")
-        
-        index_data = index_response.json()
-        
-        # Get filing date from the last-modified field of the first item
-        filing_date = index_data['directory']['item'][0]['last-modified'].split(' ')[0]
+        # Locate the information table from the (cached) filing manifest
+        xml_url, manifest = filing_manifest.info_table_url(cik, accession_number, user_agent=email)
+        filing_date = filing_date or manifest['filing_date']
         
         # Extract filing metadata
         filing_metadata = {
@@ -45,57 +44,26 @@ def get_13f_holdings(cik, accession_number, email):
         
         print(f"\n📅 Filing Date: {filing_date}")
         print("\nAvailable files in index:")
-        for file in index_data['directory']['item']:
+        for file in manifest['documents']:
             print(f"- {file['name']}")
 
-        # Try each XML file to find one containing <infoTable>
-        xml_file = None
-        xml_content = None
-        for file in index_data['directory']['item']:
-            if file['name'].endswith('.xml'):
-                xml_url = f"{base_url}/{file['name']}"
-                xml_response = requests.get(xml_url, headers=headers)
-                
-                if xml_response.status_code == 200:
-                    print(f"\nTrying XML file: {file['name']}")
-                    if "<infoTable" in xml_response.text:
-                        xml_file = file['name']
-                        xml_content = xml_response.content
-                        print(f"\n✅ Using XML file: {xml_file}")
-                        break  # Stop at first valid XML file
-
-        if not xml_file:
-            raise ValueError("No XML file found with <infoTable> elements")
-
-        root = ET.fromstring(xml_content)
-
-        # Detect namespace
-        namespace = ''
-        if root.tag.startswith('{'):
-            namespace = root.tag.split('}')[0] + '}'
-
-        holdings = []
-        for info_table in root.findall(f'.//{namespace}infoTable'):
-            holding = {
-                'nameOfIssuer': info_table.findtext(f'{namespace}nameOfIssuer'),
-                'titleOfClass': info_table.findtext(f'{namespace}titleOfClass'),
-                'cusip': info_table.findtext(f'{namespace}cusip'),
-                'value': int(info_table.findtext(f'{namespace}value', '0')),
-                'shares': int(info_table.findtext(f'{namespace}shrsOrPrnAmt/{namespace}sshPrnamt', '0')),
-                'shareType': info_table.findtext(f'{namespace}shrsOrPrnAmt/{namespace}sshPrnamtType'),
-                'investmentDiscretion': info_table.findtext(f'{namespace}investmentDiscretion')
-            }
-            holdings.append(holding)
-
-        if not holdings:
+        if not xml_url:
+            raise ValueError("No information table found in filing index")
+
+        xml_response = edgar_client.get(xml_url, user_agent=email)
+        if xml_response.status_code != 200:
+            raise ValueError(f"Failed to fetch information table: {xml_response.status_code}")
+        xml_content = xml_response.content
+        print(f"\n✅ Using XML file: {manifest['info_table']}")
+
+        # Stream-parse the information table into compact columns
+        builder = infotable.HoldingsBuilder()
+        builder.add_filing(xml_content, filingCik=cik, accessionNumber=accession_number, filingDate=filing_date)
+        if not len(builder):
             raise ValueError("No holdings data found in XML")
 
-        holdings_df = pd.DataFrame(holdings)
-        holdings_df['filingCik'] = cik
-        holdings_df['accessionNumber'] = accession_number
-        holdings_df['filingDate'] = filing_date
-        holdings_df['portfolioPercent'] = (holdings_df['value'] / holdings_df['value'].sum() * 100).round(4)
-        holdings_df = holdings_df.sort_values('value', ascending=False)
+        holdings_df = builder.to_frame(portfolio_percent=True)
+        holdings_df = holdings_df.sort_values('value', ascending=False, kind='stable')
 
         return holdings_df, filing_metadata
 
@@ -125,4 +93,7 @@ if __name__ == "__main__":
         
         print("\n📈 Portfolio Summary:")
         print(f"Total Positions: {len(holdings_df)}")
-        print(f"Total Value: ${holdings_df['value'].sum():,.0f}")
\ No newline at end of file
+        print(f"Total Value: ${holdings_df['value'].sum():,.0f}")
+
+        stored = holdings_store.HoldingsStore().load_13f_holdings(holdings_df)
+        print(f"\n💾 Stored {stored} holdings")
\ No newline at end of file
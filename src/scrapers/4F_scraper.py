@@ -1,49 +1,52 @@
 # Description: Fetch and parse Form 4 insider trading data from the SEC website.
-import requests
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import pandas as pd
 import xml.etree.ElementTree as ET
-import time
+from concurrent.futures import ThreadPoolExecutor
+
+import edgar_client
+import filing_manifest
+import holdings_store
+import submissions
 
-def get_form4_transactions(cik, accession_number, email):
+FORM4_TYPES = ['4', '4/A']
+
+def get_form4_transactions(cik, accession_number, email, primary_doc=None, filing_date=None):
     """
     Fetch and parse Form 4 insider trading data, extracting issuer, reporting owner details,
     relationships, non-derivative transactions, and derivative transactions.
+
+    When primary_doc and filing_date come from the submissions metadata, the XML
+    is fetched directly; otherwise they are looked up in the filing manifest.
     """
-    headers = {'User-Agent': email}
     accession_number = accession_number.replace('-', '')
     cik = str(cik).zfill(10)
-    base_url = f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/{accession_number}"
+    base_url = filing_manifest.base_url(cik, accession_number)
     
     try:
-        time.sleep(0.1)
-
-        index_url = f"{base_url}/index.json"
-        print(f"\nTrying to fetch index from: {index_url}")
-        index_response = requests.get(index_url, headers=headers)
-        
-        if index_response.status_code != 200:
-            raise ValueError(f"Failed to fetch index: {index_response.status_code}")
-        
-        index_data = index_response.json()
-        filing_date = index_data['directory']['item'][0]['last-modified'].split(' ')[0]
-        
-        # Find the XML file
-        xml_file = None
-        xml_content = None
-        for file in index_data['directory']['item']:
-            if file['name'].endswith('.xml'):
-                xml_url = f"{base_url}/{file['name']}"
-                print(f"\nFetching XML from: {xml_url}")
-                xml_response = requests.get(xml_url, headers=headers)
-                
-                if xml_response.status_code == 200:
-                    xml_content = xml_response.content
-                    xml_file = file['name']
-                    break
+        if primary_doc and filing_date:
+            xml_file = filing_manifest.raw_document_name(primary_doc)
+        else:
+            print(f"\nLooking up filing index for: {accession_number}")
+            manifest = filing_manifest.get_manifest(cik, accession_number, user_agent=email)
+            filing_date = filing_date or manifest['filing_date']
+            xml_file = (filing_manifest.raw_document_name(primary_doc) if primary_doc
+                        else filing_manifest.pick_document(manifest['documents'], FORM4_TYPES))
 
         if not xml_file:
             raise ValueError("No XML file found")
 
+        xml_url = f"{base_url}/{xml_file}"
+        print(f"\nFetching XML from: {xml_url}")
+        xml_response = edgar_client.get(xml_url, user_agent=email)
+        if xml_response.status_code != 200:
+            raise ValueError(f"Failed to fetch XML: {xml_response.status_code}")
+        xml_content = xml_response.content
+
         # ✅ Parse XML
         root = ET.fromstring(xml_content)
 
@@ -110,6 +113,7 @@ def get_form4_transactions(cik, accession_number, email):
 
         # ✅ Return all data
         metadata = {
+            "accession_number": accession_number,
             "filing_date": filing_date,
             "xml_file": xml_file,
             "issuer": issuer_details,
@@ -123,6 +127,78 @@ def get_form4_transactions(cik, accession_number, email):
         print(f"\n⚠️ Error fetching Form 4: {str(e)}")
         return pd.DataFrame(), pd.DataFrame(), None  # Always return a tuple
 
+def _tag_transactions(df, filing, metadata):
+    """Prefix a filing's transaction rows with issuer, owner and accession columns"""
+    tags = {
+        "Issuer CIK": filing["issuer_cik"],
+        "Accession Number": metadata["accession_number"],
+        "Form Type": filing["form_type"],
+        "Filing Date": filing["filing_date"],
+        "Owner CIK": metadata["reporting_owner"]["Owner CIK"],
+        "Owner Name": metadata["reporting_owner"]["Owner Name"],
+        "Officer Title": metadata["relationship"]["Officer Title"]
+    }
+    for position, (column, value) in enumerate(tags.items()):
+        df.insert(position, column, value)
+    return df
+
+def get_form4_transactions_batch(ciks, email, start_date=None, end_date=None, forms=FORM4_TYPES, max_workers=8):
+    """
+    Fetch and parse every Form 4 filed about one or more issuers over a date range.
+
+    Accessions are enumerated from each issuer's full submissions history and
+    fetched concurrently; edgar_client keeps the combined request rate under
+    the SEC limit.
+
+    Parameters:
+    ciks (str|list): Issuer CIK or list of issuer CIKs
+    email (str): Email for SEC request header
+    start_date (str): 'YYYY-MM-DD', earliest filing date to include
+    end_date (str): 'YYYY-MM-DD', latest filing date to include
+    forms (list): Form types to include (Form 4 and its amendments by default)
+    max_workers (int): Filings fetched concurrently
+
+    Returns:
+    tuple: (non-derivative DataFrame, derivative DataFrame), each row tagged with
+        Issuer CIK, Accession Number, Form Type, Filing Date, Owner CIK, Owner Name, Officer Title
+    """
+    if isinstance(ciks, (str, int)):
+        ciks = [ciks]
+
+    filings = []
+    for cik in ciks:
+        cik = str(cik).zfill(10)
+        try:
+            records = submissions.load_submissions(cik, since=start_date).records(forms=forms, since=start_date, until=end_date)
+        except Exception as e:
+            print(f"\n⚠️ Error listing filings for {cik}: {str(e)}")
+            continue
+        print(f"\n{cik}: {len(records)} Form 4 filings")
+        for record in records:
+            record["issuer_cik"] = cik
+            filings.append(record)
+
+    def fetch(filing):
+        return get_form4_transactions(
+            filing["issuer_cik"], filing["accession_number"], email,
+            primary_doc=filing["primary_doc"], filing_date=filing["filing_date"]
+        )
+
+    non_derivative_frames = []
+    derivative_frames = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for filing, (non_derivative_df, derivative_df, metadata) in zip(filings, executor.map(fetch, filings)):
+            if metadata is None:
+                continue
+            if not non_derivative_df.empty:
+                non_derivative_frames.append(_tag_transactions(non_derivative_df, filing, metadata))
+            if not derivative_df.empty:
+                derivative_frames.append(_tag_transactions(derivative_df, filing, metadata))
+
+    non_derivative_df = pd.concat(non_derivative_frames, ignore_index=True) if non_derivative_frames else pd.DataFrame()
+    derivative_df = pd.concat(derivative_frames, ignore_index=True) if derivative_frames else pd.DataFrame()
+    return non_derivative_df, derivative_df
+
 # Example usage
 if __name__ == "__main__":
     email = "xhaxhilenzi@gmail.com"  # Replace with your email
@@ -151,3 +227,13 @@ if __name__ == "__main__":
     print(derivative_df)
 
     print("\n🗂 Metadata:", metadata)
+
+    # Batch: three years of insider activity for a watchlist
+    watchlist = ["0001838359", "0000320193"]
+    non_derivative_df, derivative_df = get_form4_transactions_batch(
+        watchlist, email, start_date="2022-01-01", end_date="2024-12-31"
+    )
+    print(f"\n📦 Batch: {len(non_derivative_df)} non-derivative and {len(derivative_df)} derivative transactions")
+
+    stored = holdings_store.HoldingsStore().load_form4_transactions(non_derivative_df, derivative_df)
+    print(f"💾 Stored {stored} transactions")
@@ -0,0 +1,196 @@
+"""Full-history filing tables from the data.sec.gov submissions API.
+
+CIK##########.json carries the most recent ~1000 filings under
+filings['recent'] and lists older history pages
+(CIK##########-submissions-###.json) under filings['files']; heavy filers
+(e.g. BlackRock with thousands of Form 4s) push their older 13F-HRs out of
+'recent' entirely. load_submissions fetches every page concurrently through
+edgar_client (so the rate limit and the conditional-GET cache apply), merges
+them into one columnar DataFrame with a per-form row index, and keeps the
+result in memory for SEC_JSON_CACHE_TTL seconds. Passing since skips history
+pages that end before that date; such partial tables are only reused for
+requests with the same or a later since."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import edgar_cache
+import edgar_client
+
+SUBMISSIONS_URL = "https://data.sec.gov/submissions/{name}"
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def fetch_submissions(cik):
+    """Return the main submissions JSON for a CIK"""
+    cik = str(cik).zfill(10)
+    return edgar_client.get_json(SUBMISSIONS_URL.format(name=f"CIK{cik}.json"))
+
+
+def fetch_filing_pages(cik, since=None, max_workers=4, data=None):
+    """
+    Fetch the recent block plus every history page of a CIK's submissions
+
+    Parameters:
+    cik (str): Company or filer CIK
+    since (str): 'YYYY-MM-DD'; history pages that end before this date are skipped
+    max_workers (int): History pages fetched concurrently
+    data (dict): Already-fetched main submissions JSON, to avoid fetching it again
+
+    Returns:
+    tuple: (main submissions JSON, list of columnar page dicts, newest first)
+    """
+    if data is None:
+        data = fetch_submissions(cik)
+    filings = data.get('filings', {})
+    pages = [filings.get('recent', {})]
+
+    names = [
+        f['name'] for f in filings.get('files', [])
+        if since is None or f.get('filingTo', '9999-12-31') >= since
+    ]
+    if names:
+        urls = [SUBMISSIONS_URL.format(name=name) for name in names]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pages.extend(executor.map(edgar_client.get_json, urls))
+    return data, pages
+
+
+class SubmissionsTable:
+    """
+    Every filing of one CIK as a DataFrame, with a row index per form type
+
+    since is None for the full history; otherwise only filings on or after
+    that date are guaranteed to be present.
+    """
+
+    def __init__(self, cik, frame, name=None, since=None):
+        self.cik = str(cik).zfill(10)
+        self.name = name
+        self.since = since
+        self.frame = frame
+        self.form_index = {
+            form: np.asarray(rows) for form, rows in frame.groupby('form', observed=True).indices.items()
+        }
+        self.loaded_at = time.time()
+
+    @classmethod
+    def from_pages(cls, cik, data, pages, since=None):
+        frames = [pd.DataFrame(page) for page in pages if page.get('accessionNumber')]
+        if frames:
+            frame = pd.concat(frames, ignore_index=True)
+        else:
+            frame = pd.DataFrame(columns=['accessionNumber', 'filingDate', 'form', 'primaryDocument'])
+        # 'recent' comes first, so history pages never override it
+        frame = frame.drop_duplicates('accessionNumber').reset_index(drop=True)
+        frame['form'] = frame['form'].astype('category')
+        return cls(cik, frame, name=data.get('name'), since=since)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def covers(self, since=None):
+        """Whether this table holds every filing on or after since"""
+        return self.since is None or (since is not None and since >= self.since)
+
+    def forms(self):
+        """Distinct form types this CIK has filed"""
+        return sorted(self.form_index)
+
+    def filings(self, forms=None, form_filter=None, since=None, until=None):
+        """
+        Select filings
+
+        Parameters:
+        forms (list): Exact form types to keep (e.g. ['13F-HR', '13F-HR/A'])
+        form_filter (callable): Predicate on the form type; evaluated once per distinct form
+        since (str): 'YYYY-MM-DD'; keep filings on or after this date
+        until (str): 'YYYY-MM-DD'; keep filings on or before this date
+
+        Returns:
+        pandas.DataFrame: Matching rows, newest first
+        """
+        frame = self.frame
+        if forms is not None or form_filter is not None:
+            selected = [
+                form for form in self.form_index
+                if (forms is None or form in forms) and (form_filter is None or form_filter(form))
+            ]
+            rows = [self.form_index[form] for form in selected]
+            rows = np.sort(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int64)
+            frame = frame.iloc[rows]
+        if since is not None:
+            frame = frame[frame['filingDate'] >= since]
+        if until is not None:
+            frame = frame[frame['filingDate'] <= until]
+        return frame
+
+    def records(self, **kwargs):
+        """filings() as the row dicts used by the fetch scripts"""
+        frame = self.filings(**kwargs)
+        acceptance = frame['acceptanceDateTime'] if 'acceptanceDateTime' in frame else [None] * len(frame)
+        return [
+            {
+                'form_type': form_type,
+                'filing_date': filing_date,
+                'accession_number': accession,
+                'primary_doc': primary_doc,
+                'acceptance_datetime': accepted
+            }
+            for form_type, filing_date, accession, primary_doc, accepted in zip(
+                frame['form'], frame['filingDate'], frame['accessionNumber'],
+                frame['primaryDocument'], acceptance
+            )
+        ]
+
+
+def load_submissions(cik, refresh=False, max_workers=4, since=None):
+    """
+    Return the filing history of a CIK as a SubmissionsTable
+
+    Tables are cached in memory for edgar_cache.JSON_CACHE_TTL seconds; the
+    underlying pages are also revalidated on disk by edgar_client.
+
+    Parameters:
+    cik (str): Company or filer CIK
+    refresh (bool): Ignore the in-memory table
+    max_workers (int): History pages fetched concurrently
+    since (str): 'YYYY-MM-DD'; only history pages reaching this date are fetched
+        (default: the full history)
+    """
+    cik = str(cik).zfill(10)
+    with _tables_lock:
+        table = _tables.get(cik)
+    if (table is not None and not refresh and table.covers(since)
+            and time.time() - table.loaded_at < edgar_cache.JSON_CACHE_TTL):
+        return table
+
+    data, pages = fetch_filing_pages(cik, since=since, max_workers=max_workers)
+    table = SubmissionsTable.from_pages(cik, data, pages, since=since)
+    with _tables_lock:
+        _tables[cik] = table
+    return table
+
+
+def iter_filings(cik, form_filter=None, since=None, max_workers=4):
+    """
+    Yield one dict per accession across the full filing history of a CIK
+
+    Parameters:
+    cik (str): Company or filer CIK
+    form_filter (callable): Keep only filings whose form type passes this predicate
+    since (str): 'YYYY-MM-DD'; drop filings before this date
+    max_workers (int): History pages fetched concurrently
+
+    Yields:
+    dict: {'form_type', 'filing_date', 'accession_number', 'primary_doc',
+        'acceptance_datetime'}
+    """
+    table = load_submissions(cik, max_workers=max_workers, since=since)
+    yield from table.records(form_filter=form_filter, since=since)
@@ -0,0 +1,308 @@
+"""Incremental sync of tracked filers into the local holdings store.
+
+The fetch scripts list a filer's whole history and parse every filing on
+each run. sync() keeps a watermark per (CIK, form type) in the store (the
+last accession synced and its acceptance time) and on each run:
+
+    1. revalidates each CIK's submissions (a 304 when nothing was filed)
+    2. keeps filings accepted at or after the watermark that are not
+       already recorded in the store
+    3. fetches and parses only those, oldest first, loads them into the
+       store and advances the watermark
+
+A filing that fails is not recorded and holds its form's watermark back,
+so the next run retries it. Tracked form groups:
+
+    13F    13F-HR, 13F-HR/A filed by the CIK (fund side)
+    4      Form 4 and amendments listed under the CIK (issuer or insider side)
+    13DG   Schedule 13D/13G filed about the CIK (subject company side)
+
+Watchlist file format (one filer per line, '#' comments):
+    0001364742 13F
+    0001838359 4 13DG"""
+
+import importlib.util
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import cover_page
+import edgar_client
+import filing_manifest
+import holdings_store
+import parse_pool
+import submissions
+
+FORM_GROUPS = {
+    '13F': lambda form_type: form_type in ('13F-HR', '13F-HR/A'),
+    '4': lambda form_type: form_type in ('4', '4/A'),
+    '13DG': lambda form_type: '13D' in form_type or '13G' in form_type,
+}
+
+_form4_scraper = None
+
+
+def form4_scraper():
+    """scrapers/4F_scraper.py (not importable by name)"""
+    global _form4_scraper
+    if _form4_scraper is None:
+        spec = importlib.util.spec_from_file_location(
+            'form4_scraper', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scrapers', '4F_scraper.py')
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _form4_scraper = module
+    return _form4_scraper
+
+
+def _accepted(record):
+    return record.get('acceptance_datetime') or record['filing_date']
+
+
+def new_filings(store, cik, groups=tuple(FORM_GROUPS), since=None, refresh=True):
+    """
+    Diff a CIK's current submissions against its watermarks
+
+    Parameters:
+    store (holdings_store.HoldingsStore): Store holding the watermarks
+    cik (str): Filer CIK
+    groups (list): Keys of FORM_GROUPS to sync
+    since (str): 'YYYY-MM-DD'; ignore older filings when a form has no watermark yet
+    refresh (bool): Revalidate the submissions instead of using the in-memory table
+
+    Returns:
+    list: (group, filing record) pairs not yet synced, oldest first
+    """
+    table = submissions.load_submissions(cik, refresh=refresh)
+    marks = store.get_watermarks(cik)
+
+    pending = []
+    for group in groups:
+        for record in table.records(form_filter=FORM_GROUPS[group]):
+            mark = marks.get(record['form_type'])
+            if mark is not None:
+                if _accepted(record) < (mark['acceptance_datetime'] or mark['filing_date']):
+                    continue
+                if record['accession_number'].replace('-', '') == mark['accession']:
+                    continue
+            elif since is not None and record['filing_date'] < since:
+                continue
+            pending.append((group, record))
+
+    known = store.known_accessions([record['accession_number'] for _, record in pending])
+    pending = [(group, record) for group, record in pending if record['accession_number'].replace('-', '') not in known]
+    return sorted(pending, key=lambda item: _accepted(item[1]))
+
+
+def _fetch_13f(cik, record, email, pool):
+    """Information table of a 13F-HR as a HoldingsBuilder (None if the filing has none)"""
+    url, _ = filing_manifest.info_table_url(cik, record['accession_number'], user_agent=email)
+    if url is None:
+        return None
+    response = edgar_client.get(url, user_agent=email)
+    response.raise_for_status()
+    metadata = {
+        'filingCik': cik,
+        'accessionNumber': record['accession_number'].replace('-', ''),
+        'filingDate': record['filing_date']
+    }
+    return pool.submit(parse_pool.parse_13f, response.content, metadata).result()
+
+
+def _store_13f(store, record, builder):
+    if builder is not None and len(builder):
+        store.load_13f_holdings(builder.to_frame(portfolio_percent=True), form=record['form_type'])
+
+
+def _fetch_form4(cik, record, email, pool):
+    """Tagged (non-derivative, derivative) transactions of a Form 4"""
+    scraper = form4_scraper()
+    non_derivative_df, derivative_df, metadata = scraper.get_form4_transactions(
+        cik, record['accession_number'], email,
+        primary_doc=record['primary_doc'], filing_date=record['filing_date']
+    )
+    if metadata is None:
+        raise ValueError("Form 4 could not be parsed")
+
+    issuer_cik = metadata['issuer']['Issuer CIK']
+    filing = dict(record, issuer_cik=issuer_cik.zfill(10) if issuer_cik.isdigit() else cik)
+    frames = []
+    for frame in (non_derivative_df, derivative_df):
+        frames.append(scraper._tag_transactions(frame, filing, metadata) if not frame.empty else frame)
+    return frames
+
+
+def _store_form4(store, record, frames):
+    store.load_form4_transactions(*frames)
+
+
+def _fetch_13dg(cik, record, email, pool):
+    """Cover page positions of a 13D/13G, in the fetch_major_shareholders columns"""
+    primary_doc = filing_manifest.raw_document_name(record['primary_doc'])
+    doc_url = f"{filing_manifest.base_url(cik, record['accession_number'])}/{primary_doc}"
+    rows = []
+    for person in cover_page.parse_document(doc_url, user_agent=email):
+        rows.append({
+            'Shareholder Name': person['name'],
+            'Form Type': record['form_type'],
+            'Filing Date': record['filing_date'],
+            'Document URL': doc_url,
+            'Ownership %': person.get('percent'),
+            'Shares Owned': person.get('aggregate'),
+            'Sole Voting Power': person.get('sole_voting'),
+            'Shared Voting Power': person.get('shared_voting'),
+            'Source of Funds': person.get('source_of_funds')
+        })
+    return pd.DataFrame(rows)
+
+
+def _store_13dg(store, record, positions):
+    store.load_13dg_positions(positions)
+
+
+HANDLERS = {
+    '13F': (_fetch_13f, _store_13f),
+    '4': (_fetch_form4, _store_form4),
+    '13DG': (_fetch_13dg, _store_13dg),
+}
+
+
+def sync_filer(store, cik, groups=tuple(FORM_GROUPS), email=None, since=None, pending=None,
+               executor=None, pool=None):
+    """
+    Fetch, parse and store a CIK's filings newer than its watermarks
+
+    Parameters:
+    store (holdings_store.HoldingsStore): Target store
+    cik (str): Filer CIK
+    groups (list): Keys of FORM_GROUPS to sync
+    email (str): Email for SEC request header
+    since (str): 'YYYY-MM-DD' lower bound for forms without a watermark
+    pending (list): Output of new_filings, if already computed
+    executor (ThreadPoolExecutor): Fetches filings concurrently (one is created if omitted)
+    pool (parse_pool.ParsePool): Parses 13F information tables (one is created if omitted)
+
+    Returns:
+    int: Filings synced
+    """
+    cik = str(cik).zfill(10)
+    if pending is None:
+        pending = new_filings(store, cik, groups, since=since)
+    if not pending:
+        return 0
+
+    own_executor = executor is None
+    own_pool = pool is None
+    executor = executor or ThreadPoolExecutor(max_workers=8)
+    pool = pool or parse_pool.ParsePool()
+    try:
+        futures = [
+            executor.submit(HANDLERS[group][0], cik, record, email, pool) for group, record in pending
+        ]
+
+        synced = 0
+        held_back = set()
+        for (group, record), future in zip(pending, futures):
+            form_type = record['form_type']
+            try:
+                HANDLERS[group][1](store, record, future.result())
+            except Exception as e:
+                print(f"Error syncing {form_type} {record['accession_number']}: {str(e)}")
+                held_back.add(form_type)
+                continue
+
+            # 13D/G filings are listed under the subject company; the filer is not known here
+            store.add_filings([{
+                'accession': record['accession_number'],
+                'filer_cik': None if group == '13DG' else cik,
+                'issuer_cik': cik if group == '13DG' else None,
+                'form': form_type,
+                'filing_date': record['filing_date'],
+                'acceptance_datetime': record.get('acceptance_datetime'),
+                'primary_doc': record['primary_doc']
+            }])
+            if form_type not in held_back:
+                store.set_watermark(
+                    cik, form_type, record['accession_number'],
+                    record.get('acceptance_datetime'), record['filing_date']
+                )
+            synced += 1
+        return synced
+    finally:
+        if own_executor:
+            executor.shutdown()
+        if own_pool:
+            pool.shutdown()
+
+
+def sync(tracked, email=None, since=None, store=None, max_workers=8, parse_workers=None):
+    """
+    Incrementally sync a set of tracked filers
+
+    Parameters:
+    tracked (dict|list): CIK -> FORM_GROUPS keys, or a list of CIKs to sync for every group
+    email (str): Email for SEC request header
+    since (str): 'YYYY-MM-DD' lower bound for forms without a watermark (first run backfill)
+    store (holdings_store.HoldingsStore): Target store (default SEC_STORE_URL)
+    max_workers (int): Concurrent submissions / document fetches
+    parse_workers (int): Processes parsing information tables (default SEC_PARSE_WORKERS)
+
+    Returns:
+    dict: CIK -> filings synced, for CIKs that had new filings
+    """
+    if not isinstance(tracked, dict):
+        tracked = {cik: tuple(FORM_GROUPS) for cik in tracked}
+    tracked = {str(cik).zfill(10): groups for cik, groups in tracked.items()}
+    store = store or holdings_store.HoldingsStore()
+
+    def revalidate(cik):
+        try:
+            submissions.load_submissions(cik, refresh=True)
+            return cik
+        except Exception as e:
+            print(f"Error listing filings for {cik}: {str(e)}")
+            return None
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor, parse_pool.ParsePool(parse_workers) as pool:
+        # Submissions are revalidated concurrently; the diff then reads the in-memory tables
+        for cik in executor.map(revalidate, tracked):
+            if cik is None:
+                continue
+            pending = new_filings(store, cik, tracked[cik], since=since, refresh=False)
+            if not pending:
+                continue
+            print(f"{cik}: {len(pending)} new filings")
+            results[cik] = sync_filer(
+                store, cik, tracked[cik], email=email, pending=pending, executor=executor, pool=pool
+            )
+    return results
+
+
+def read_watchlist(path):
+    """Parse a watchlist file into {cik: groups}"""
+    tracked = {}
+    with open(path) as f:
+        for line in f:
+            fields = line.split('#', 1)[0].split()
+            if fields:
+                tracked[fields[0].zfill(10)] = tuple(fields[1:]) or tuple(FORM_GROUPS)
+    return tracked
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+
+    email = "xhaxhilenzi@gmail.com"  # Replace with your email
+    if len(sys.argv) > 1:
+        tracked = read_watchlist(sys.argv[1])
+    else:
+        tracked = {
+            "0001364742": ("13F",),       # BlackRock Inc.
+            "0001838359": ("4", "13DG"),  # Rigetti Computing
+        }
+
+    results = sync(tracked, email=email, since="2024-01-01")
+    print(f"Synced {sum(results.values())} filings across {len(results)} of {len(tracked)} filers")
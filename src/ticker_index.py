@@ -0,0 +1,112 @@
+"""Load-once ticker <-> CIK index built from SEC's company_tickers.json.
+
+The file is downloaded at most once a day, persisted under SEC_CACHE_DIR and
+kept in memory as dicts, so lookups are O(1) instead of a full download and
+linear scan per ticker."""
+
+import json
+import os
+import threading
+import time
+
+import edgar_cache
+import edgar_client
+
+COMPANY_TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
+TICKER_INDEX_PATH = os.path.join(edgar_cache.CACHE_DIR, 'company_tickers.json')
+TICKER_INDEX_MAX_AGE = 24 * 60 * 60  # refresh daily
+
+_index = None
+_index_lock = threading.Lock()
+
+
+class TickerIndex:
+    """Dict-backed lookups over the rows of company_tickers.json"""
+
+    def __init__(self, companies):
+        self.by_ticker = {}
+        self.tickers_by_cik = {}
+        self.title_by_cik = {}
+        # The SEC file is ordered by market cap; keep that order for title searches
+        self.titles = []
+        self.loaded_at = time.time()
+
+        for entry in companies.values():
+            cik = str(entry['cik_str']).zfill(10)
+            ticker = entry['ticker'].upper()
+            self.by_ticker.setdefault(ticker, cik)
+            self.tickers_by_cik.setdefault(cik, []).append(ticker)
+            if cik not in self.title_by_cik:
+                self.title_by_cik[cik] = entry['title']
+                self.titles.append((entry['title'].lower(), cik))
+
+    def __len__(self):
+        return len(self.by_ticker)
+
+    def cik_for_ticker(self, ticker):
+        """Return the 10-digit CIK for a ticker, or None"""
+        return self.by_ticker.get(ticker.upper())
+
+    def tickers_for_cik(self, cik):
+        """Return every ticker listed under a CIK (empty list if unknown)"""
+        return list(self.tickers_by_cik.get(str(cik).zfill(10), []))
+
+    def title_for_cik(self, cik):
+        return self.title_by_cik.get(str(cik).zfill(10))
+
+    def find_title(self, company_name):
+        """
+        Case-insensitive substring search over company titles
+
+        Returns:
+        dict: {'cik', 'name'} for the largest matching company, or None
+        """
+        needle = company_name.lower()
+        for title, cik in self.titles:
+            if needle in title:
+                return {'cik': cik, 'name': self.title_by_cik[cik]}
+        return None
+
+
+def _load_companies(refresh):
+    """Read company_tickers.json from disk, downloading it when missing or older than a day"""
+    try:
+        age = time.time() - os.path.getmtime(TICKER_INDEX_PATH)
+    except OSError:
+        age = None
+
+    if refresh or age is None or age > TICKER_INDEX_MAX_AGE:
+        try:
+            response = edgar_client.get(COMPANY_TICKERS_URL)
+            response.raise_for_status()
+            companies = response.json()
+            edgar_cache.write_atomic(TICKER_INDEX_PATH, response.content)
+            return companies
+        except Exception:
+            # A stale local copy beats failing the whole run
+            if age is None:
+                raise
+
+    with open(TICKER_INDEX_PATH, 'r') as f:
+        return json.load(f)
+
+
+def get_ticker_index(refresh=False):
+    """Return the process-wide TickerIndex, loading it on first use"""
+    global _index
+    with _index_lock:
+        stale = _index is not None and time.time() - _index.loaded_at > TICKER_INDEX_MAX_AGE
+        if _index is None or refresh or stale:
+            _index = TickerIndex(_load_companies(refresh))
+        return _index
+
+
+def get_cik(ticker):
+    """Return the 10-digit CIK for a ticker, or None if it is not listed"""
+    return get_ticker_index().cik_for_ticker(ticker)
+
+
+def get_ticker(cik):
+    """Return the primary ticker for a CIK, or None"""
+    tickers = get_ticker_index().tickers_for_cik(cik)
+    return tickers[0] if tickers else None
@@ -0,0 +1,73 @@
+import json
+import zipfile
+
+import companyfacts_bulk
+
+
+def _company(cik, name, values):
+    return {
+        'cik': cik,
+        'entityName': name,
+        'facts': {
+            'dei': {
+                'EntityCommonStockSharesOutstanding': {
+                    'label': 'Entity Common Stock, Shares Outstanding',
+                    'units': {'shares': values}
+                }
+            }
+        }
+    }
+
+
+def _write_zip(path):
+    # First company: instant values only (no start) and integer vals
+    first = _company(320193, 'Apple Inc.', [
+        {'end': '2023-10-20', 'val': 15552752000, 'accn': '0000320193-23-000106',
+         'fy': 2023, 'fp': 'FY', 'form': '10-K', 'filed': '2023-11-03', 'frame': 'CY2023Q3I'},
+        {'end': '2024-01-19', 'val': 15441881000, 'accn': '0000320193-24-000006',
+         'fy': 2024, 'fp': 'Q1', 'form': '10-Q', 'filed': '2024-02-02'},
+    ])
+    # Second company: float vals, start dates and a missing fy
+    second = _company(789019, 'Microsoft Corp', [
+        {'start': '2023-07-01', 'end': '2023-09-30', 'val': 7429.5, 'accn': '0000950170-23-054855',
+         'fy': None, 'fp': 'Q1', 'form': '10-Q', 'filed': '2023-10-24'},
+    ])
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('CIK0000320193.json', json.dumps(first))
+        archive.writestr('CIK0000789019.json', json.dumps(second))
+
+
+def test_mixed_batches_read_back_as_one_dataset(tmp_path):
+    zip_path = tmp_path / 'companyfacts.zip'
+    out_dir = tmp_path / 'store'
+    _write_zip(zip_path)
+
+    shards = companyfacts_bulk.load_companyfacts_zip(str(zip_path), out_dir=str(out_dir), workers=1, batch_size=1)
+    assert len(shards) == 2
+
+    facts = companyfacts_bulk.read_facts(str(out_dir))
+    assert list(facts.columns) == companyfacts_bulk.FACT_COLUMNS
+    assert len(facts) == 3
+    assert str(facts['val'].dtype) == 'float64'
+    assert str(facts['fy'].dtype) == 'Int16'
+    assert str(facts['cik'].dtype) == 'category'
+
+    facts = facts.sort_values('val').reset_index(drop=True)
+    assert facts.loc[0, 'cik'] == '0000789019'
+    assert facts.loc[0, 'start'] == '2023-07-01'
+    assert facts['fy'].isna().sum() == 1
+    assert facts.loc[2, 'val'] == 15552752000.0
+    assert facts['start'].isna().sum() == 2
+
+
+def test_read_facts_filters_and_columns(tmp_path):
+    zip_path = tmp_path / 'companyfacts.zip'
+    out_dir = tmp_path / 'store'
+    _write_zip(zip_path)
+    companyfacts_bulk.load_companyfacts_zip(str(zip_path), out_dir=str(out_dir), workers=1, batch_size=1)
+
+    facts = companyfacts_bulk.read_facts(
+        str(out_dir), columns=['cik', 'end', 'val'], filters=[('cik', '==', '0000320193')]
+    )
+    assert list(facts.columns) == ['cik', 'end', 'val']
+    assert sorted(facts['end']) == ['2023-10-20', '2024-01-19']
@@ -0,0 +1,112 @@
+"""AddCompanyFactsToDB against a local Firestore emulator.
+
+Start one with `gcloud emulators firestore start --host-port=localhost:8080`
+and run with FIRESTORE_EMULATOR_HOST=localhost:8080; skipped otherwise."""
+
+import copy
+import importlib.util
+import os
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    not os.getenv('FIRESTORE_EMULATOR_HOST'), reason="FIRESTORE_EMULATOR_HOST is not set"
+)
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+CIK = '0009999999'
+
+FACTS = {
+    'cik': 9999999,
+    'entityName': 'Emulator Test Corp',
+    'facts': {
+        'dei': {
+            'EntityCommonStockSharesOutstanding': {
+                'label': 'Entity Common Stock, Shares Outstanding',
+                'units': {'shares': [
+                    {'end': '2022-10-20', 'val': 1000, 'accn': '0009999999-22-000001',
+                     'fy': 2022, 'fp': 'FY', 'form': '10-K', 'filed': '2022-11-01'},
+                    {'end': '2023-10-20', 'val': 1100, 'accn': '0009999999-23-000001',
+                     'fy': 2023, 'fp': 'FY', 'form': '10-K', 'filed': '2023-11-01'},
+                ]}
+            }
+        },
+        'us-gaap': {
+            'Revenues': {
+                'label': 'Revenues',
+                'units': {'USD': [
+                    {'start': '2023-01-01', 'end': '2023-12-31', 'val': 5.5e6, 'accn': '0009999999-24-000001',
+                     'fy': 2023, 'fp': 'FY', 'form': '10-K', 'filed': '2024-02-01'},
+                ]}
+            }
+        }
+    }
+}
+
+
+@pytest.fixture
+def facts_db(monkeypatch):
+    spec = importlib.util.spec_from_file_location(
+        'add_company_facts', os.path.join(SRC, 'saveToDB', 'AddCompanyFactsToDB.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    facts = {CIK: copy.deepcopy(FACTS)}
+    monkeypatch.setattr(module, 'fetch_company_facts', lambda cik: copy.deepcopy(facts.get(cik)))
+
+    db = module.get_db()
+    _clear(db, module)
+    yield module, db, facts
+    _clear(db, module)
+
+
+def _clear(db, module):
+    for doc_ref in db.collection(f'sec_data_{CIK}').list_documents():
+        doc_ref.delete()
+    db.collection(module.LATEST_COLLECTION).document(CIK).delete()
+
+
+def _shard_ids(db):
+    return sorted(doc_ref.id for doc_ref in db.collection(f'sec_data_{CIK}').list_documents())
+
+
+def test_write_skip_unchanged_and_force_delete(facts_db):
+    module, db, facts = facts_db
+
+    # First run writes every shard plus the latest-values document
+    assert module.store_company_facts(CIK) == {CIK: 4}
+    assert _shard_ids(db) == [
+        'Entity Common Stock, Shares Outstanding__2022',
+        'Entity Common Stock, Shares Outstanding__2023',
+        'Revenues__2023',
+    ]
+    latest = module.get_latest(CIK)
+    assert latest['metrics']['Revenues']['USD']['val'] == 5.5e6
+    assert latest[module.HASH_FIELD]
+
+    # Unchanged facts: nothing is written
+    assert module.store_company_facts(CIK) == {CIK: 0}
+
+    # A restated prior-year value only rewrites that year's shard
+    shares = facts[CIK]['facts']['dei']['EntityCommonStockSharesOutstanding']['units']['shares']
+    shares[0]['val'] = 1001
+    assert module.store_company_facts(CIK) == {CIK: 1}
+    units = module.get_concept(CIK, 'Entity Common Stock, Shares Outstanding', years=['2022'])
+    assert [entry['val'] for entry in units['shares']] == [1001]
+
+    # force rewrites everything and still deletes shards SEC no longer reports
+    del facts[CIK]['facts']['us-gaap']
+    assert module.store_company_facts(CIK, force=True) == {CIK: 3}
+    assert _shard_ids(db) == [
+        'Entity Common Stock, Shares Outstanding__2022',
+        'Entity Common Stock, Shares Outstanding__2023',
+    ]
+    assert 'Revenues' not in module.get_latest(CIK)['metrics']
+
+
+def test_unfetchable_cik_writes_nothing(facts_db):
+    module, db, _ = facts_db
+
+    assert module.store_company_facts('0000000001') == {'0000000001': None}
+    assert _shard_ids(db) == []
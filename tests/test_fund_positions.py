@@ -0,0 +1,99 @@
+import importlib.util
+import os
+from concurrent.futures import Future
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+
+@pytest.fixture
+def fetcher(monkeypatch):
+    spec = importlib.util.spec_from_file_location(
+        'fund_positions', os.path.join(SRC, '13G13DfetchParseSpecificFundPositions.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    filings = {
+        # Subject company: one filing by the fund, one by another holder
+        '0001321655': [
+            {'accession_number': '0000102909-24-000001', 'form_type': 'SC 13G',
+             'filing_date': '2024-02-13', 'primary_doc': 'vanguard.txt'},
+            {'accession_number': '0001086364-24-000002', 'form_type': 'SC 13G',
+             'filing_date': '2024-02-09', 'primary_doc': 'blackrock.txt'},
+        ],
+        # The fund's own filings
+        '0000102909': [
+            {'accession_number': '0000102909-24-000001', 'form_type': 'SC 13G',
+             'filing_date': '2024-02-13', 'primary_doc': 'vanguard.txt'},
+        ],
+    }
+    listed = []
+
+    def iter_filings(cik, form_filter=None, since=None):
+        listed.append(cik)
+        return iter(filings[cik])
+
+    submitted = []
+
+    def submit_filing(pool, filing, cik):
+        submitted.append(filing['accession_number'])
+        future = Future()
+        future.set_result([{'name': 'HOLDER ' + filing['primary_doc'], 'aggregate': 1000, 'percent': 5.0}])
+        return module.document_url(filing, cik), future, False
+
+    monkeypatch.setattr(module.ticker_index, 'get_cik', lambda ticker: '0001321655')
+    monkeypatch.setattr(module.submissions, 'iter_filings', iter_filings)
+    monkeypatch.setattr(module, 'submit_filing', submit_filing)
+    module.listed = listed
+    module.submitted = submitted
+    return module
+
+
+class _Index:
+    def __init__(self, match):
+        self.match = match
+
+    def resolve(self, fund_name):
+        return self.match
+
+
+def test_matched_fund_only_parses_its_own_filings(fetcher, monkeypatch):
+    match = {'cik': '0000102909', 'name': 'VANGUARD GROUP INC', 'score': 1.0}
+    monkeypatch.setattr(fetcher.fund_index, 'get_fund_index', lambda: _Index(match))
+
+    positions = fetcher.fetch_fund_positions('Vanguard Group Inc', ['PLTR'], parse_workers=1)
+
+    assert fetcher.listed == ['0000102909', '0001321655']
+    assert fetcher.submitted == ['0000102909-24-000001']
+    assert list(positions['Investor']) == ['HOLDER vanguard.txt']
+
+
+def test_loose_match_falls_back_to_per_ticker_scan(fetcher, monkeypatch, capsys):
+    match = {'cik': '0000999999', 'name': 'VANGUARD GREEN ENERGY FUND', 'score': 0.62}
+    monkeypatch.setattr(fetcher.fund_index, 'get_fund_index', lambda: _Index(match))
+
+    positions = fetcher.fetch_fund_positions('Vanguard Group Inc', ['PLTR'], parse_workers=1)
+
+    assert fetcher.listed == ['0001321655']
+    assert fetcher.submitted == ['0000102909-24-000001', '0001086364-24-000002']
+    assert len(positions) == 2
+    assert 'WARNING: falling back' in capsys.readouterr().out
+
+
+def test_unresolved_fund_falls_back_to_per_ticker_scan(fetcher, monkeypatch, capsys):
+    monkeypatch.setattr(fetcher.fund_index, 'get_fund_index', lambda: _Index(None))
+
+    positions = fetcher.fetch_fund_positions('No Such Fund', ['PLTR'], parse_workers=1)
+
+    assert fetcher.submitted == ['0000102909-24-000001', '0001086364-24-000002']
+    assert len(positions) == 2
+    assert 'WARNING: fund-centric lookup disabled' in capsys.readouterr().out
+
+
+def test_exact_name_below_min_score_is_accepted(fetcher, monkeypatch):
+    match = {'cik': '0000102909', 'name': 'Vanguard Group Inc.', 'score': 0.85}
+    monkeypatch.setattr(fetcher.fund_index, 'get_fund_index', lambda: _Index(match))
+
+    assert fetcher.get_fund_cik('VANGUARD GROUP, INC') == '0000102909'